@@ -0,0 +1,212 @@
+"""
+Runs batches of Brewin# programs across a pool of worker processes, for main.py --batch,
+and one program against many inputs, for main.py --inputs
+"""
+
+import gc
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from glob import glob
+from heapq import heappop, heappush
+from multiprocessing import get_context
+from os import cpu_count
+from os.path import isdir, join, splitext, exists
+
+from budget import ExecutionBudget
+from cancellation import CancellationToken
+
+
+def find_jobs(source):
+    """
+    Jobs from source, lazily: either a directory, whose .brewin files are run with the
+    .in file next to them if there is one, or a JSONL manifest of jobs. A job is a dict
+    of program (a path) and optionally input (a path, or a list of lines) and id
+    """
+    if isdir(source):
+        for path in sorted(glob(join(source, "*.brewin"))):
+            input_path = splitext(path)[0] + ".in"
+            yield {"program": path, "input": input_path if exists(input_path) else None}
+        return
+
+    with open(source, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def run_job(job, limits=None, timeout=None):
+    """
+    Run one job in a fresh Interpreter, returning its result: the job's id or program,
+    the lines it printed, the error it ended with, and how long it took
+    limits are the ExecutionBudget limits for the run, and a run still going after
+    timeout seconds is cancelled
+    """
+    from interpreterv3 import Interpreter
+
+    job_id = job.get("id", job.get("program"))
+    try:
+        with open(job["program"], encoding="utf-8") as handle:
+            program = handle.readlines()
+
+        inp = job.get("input")
+        if isinstance(inp, str):
+            with open(inp, encoding="utf-8") as handle:
+                inp = [line.rstrip("\n") for line in handle]
+    except (KeyError, OSError) as exception:
+        error = {"type": type(exception).__name__, "line": None, "message": str(exception)}
+        return {"id": job_id, "output": [], "error": error, "seconds": 0}
+
+    # a new Interpreter starts from empty type registries, so jobs can't see each other's classes
+    cancel_token = CancellationToken()
+    interpreter = Interpreter(
+        False, inp if inp is not None else [], budget=ExecutionBudget(**(limits or {})), cancel_token=cancel_token
+    )
+    return {"id": job_id, **timed_run(interpreter, lambda: interpreter.run(program), cancel_token, timeout)}
+
+
+def timed_run(interpreter, run, cancel_token, timeout=None):
+    """
+    Call run, which runs a program on interpreter, cancelling cancel_token (the run's)
+    after timeout seconds; returns the lines it printed, the error it ended with, and
+    how long it took
+    """
+    timer = threading.Timer(timeout, cancel_token.cancel) if timeout else None
+    if timer is not None:
+        timer.start()
+
+    start = time.perf_counter()
+    error = None
+    try:
+        run()
+    except Exception as exception:  # pylint: disable=broad-except
+        # errors raised through InterpreterBase.error have a type; anything else, like a
+        # RecursionError (also a RuntimeError) from runaway recursion, is named by its class
+        error_type, error_line = interpreter.get_error_type_and_line()
+        if error_type is None:
+            error_type = type(exception).__name__
+        error = {"type": str(error_type), "line": error_line, "message": str(exception)}
+    finally:
+        if timer is not None:
+            timer.cancel()
+
+    return {
+        "output": interpreter.get_output(),
+        "error": error,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run_batch(jobs, workers=None, limits=None, timeout=None):
+    """
+    Results of jobs run across workers processes (by default, one per core), yielded
+    in the order they complete. Only a few jobs per worker are read ahead of the
+    ones running, so memory stays bounded however many jobs there are
+    """
+    workers = workers or cpu_count() or 1
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("fork")) as executor:
+        running = set()
+        while True:
+            for job in jobs:
+                running.add(executor.submit(run_job, job, limits, timeout))
+                if len(running) >= 2 * workers:
+                    break
+            if not running:
+                return
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+# the Program a run_many worker runs, inherited from the parent when the worker is forked
+_program = None
+
+
+def find_inputs(source):
+    """
+    Inputs from source, lazily: either a directory, each of whose .in files (in sorted
+    order) is an input, or a JSONL file with an input per line, each a list of lines
+    or the path of a file of them
+    """
+    if isdir(source):
+        yield from sorted(glob(join(source, "*.in")))
+        return
+
+    with open(source, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def run_many(source, inputs, workers=None, limits=None, timeout=None, ordered=True):
+    """
+    Results of running the program source (a list of lines) once with each of inputs
+    (lists of lines, or paths of files of them) across workers processes (by default,
+    one per core). The program is compiled once, before the workers are forked, and
+    they share the compiled form rather than each parsing it again
+    Results are dicts of the index of their input, output, error and seconds, yielded
+    in input order, or with ordered=False as soon as each run completes. A program that
+    doesn't compile raises RuntimeError before anything is run
+    limits and timeout apply to each run, as for run_batch
+    """
+    global _program  # pylint: disable=global-statement
+    from interpreterv3 import Interpreter
+
+    interpreter = Interpreter(
+        False, [], budget=ExecutionBudget(**(limits or {})), cancel_token=CancellationToken()
+    )
+    _program = interpreter.compile(source)
+    # keep the garbage collector from writing to the compiled program's objects in the
+    # workers, so their pages stay shared with the parent instead of being copied
+    gc.freeze()
+
+    workers = workers or cpu_count() or 1
+    inputs = enumerate(inputs)
+    # results that arrived before some earlier input's, as (index, result); while an
+    # early input is slow, no more are started once this many have piled up behind it
+    finished = []
+    max_finished = 4 * workers
+    next_index = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("fork")) as executor:
+            running = set()
+            while True:
+                while len(running) < 2 * workers and len(finished) < max_finished:
+                    next_input = next(inputs, None)
+                    if next_input is None:
+                        break
+                    running.add(executor.submit(run_input, *next_input, timeout))
+                if not running:
+                    return
+
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if not ordered:
+                        yield result
+                        continue
+                    heappush(finished, (result["index"], result))
+                while finished and finished[0][0] == next_index:
+                    yield heappop(finished)[1]
+                    next_index += 1
+    finally:
+        gc.unfreeze()
+        _program = None
+
+
+def run_input(index, inp, timeout=None):
+    """Run the Program compiled by run_many with the index-th input, in a worker"""
+    if isinstance(inp, str):
+        try:
+            with open(inp, encoding="utf-8") as handle:
+                inp = [line.rstrip("\n") for line in handle]
+        except OSError as exception:
+            error = {"type": type(exception).__name__, "line": None, "message": str(exception)}
+            return {"index": index, "output": [], "error": error, "seconds": 0}
+
+    cancel_token = CancellationToken()
+    run = lambda: _program.run(inp, cancel_token=cancel_token)
+    return {"index": index, **timed_run(_program.interpreter, run, cancel_token, timeout)}
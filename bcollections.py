@@ -0,0 +1,143 @@
+from array import array
+from intbase import ErrorType
+from btypes import Type
+from value import Value, get_default_value
+from result import Result
+from native import NativeTClassDef
+
+ARRAY_DEF = "array"
+MAP_DEF = "map"
+
+
+def to_element(value):
+    # collections store the underlying Python values, not Values
+    return value.value
+
+
+def from_element(element_type, element):
+    # rebuild the Value for an element of a collection of element_type
+    if element_type == Type.BOOL:
+        return Value(Type.BOOL, bool(element))
+    if isinstance(element_type, Type):
+        return Value(element_type, element)
+    if element is None:
+        return Value(Type.NULL, None)
+    # objects keep their most derived type
+    return Value(element.name, element)
+
+
+def to_key(value):
+    # string keys may be Ropes, which have to be flattened to hash
+    if value.type == Type.STRING:
+        return str(value.value)
+    return value.value
+
+
+class ArrayTClassDef(NativeTClassDef):
+    """
+    Built-in templated class array@T: a growable, indexable sequence of T
+    ints and bools are stored in a typed Python array, everything else in a list
+    """
+    def __init__(self, interpreter_ref):
+        super().__init__(ARRAY_DEF, ["T"], interpreter_ref)
+
+    def methods(self):
+        return [
+            ("int", "length", (), self.__length),
+            ("T", "get", (("int", "index"),), self.__get),
+            ("void", "set", (("int", "index"), ("T", "value")), self.__set),
+            ("void", "append", (("T", "value"),), self.__append),
+        ]
+
+    def create_native_state(self, class_def):
+        match class_def.type_arguments[0]:
+            case Type.INT:
+                return array("q")
+            case Type.BOOL:
+                return array("b")
+            case _:
+                return []
+
+    def __check_index(self, obj, index, line_num):
+        if not 0 <= index < len(obj.native_state):
+            self.interpreter_ref.error(
+                ErrorType.FAULT_ERROR,
+                f"Index {index} out of bounds for {obj.name} of length {len(obj.native_state)}",
+                line_num
+            )
+
+    def __length(self, obj, line_num):
+        return Value(Type.INT, len(obj.native_state))
+
+    def __get(self, obj, line_num, index):
+        self.__check_index(obj, index.value, line_num)
+        return from_element(obj.class_def.type_arguments[0], obj.native_state[index.value])
+
+    def __set(self, obj, line_num, index, value):
+        self.__check_index(obj, index.value, line_num)
+        try:
+            obj.native_state[index.value] = to_element(value)
+        except OverflowError:
+            # Brewin ints are unbounded, so fall back to a list once they outgrow the typed array
+            obj.native_state = list(obj.native_state)
+            obj.native_state[index.value] = to_element(value)
+
+    def __append(self, obj, line_num, value):
+        try:
+            obj.native_state.append(to_element(value))
+        except OverflowError:
+            obj.native_state = list(obj.native_state)
+            obj.native_state.append(to_element(value))
+
+
+class MapTClassDef(NativeTClassDef):
+    """
+    Built-in templated class map@K@V: a hash map from K to V
+    K must be int, string or bool; looking up a missing key gives the default value of V
+    """
+    KEY_TYPES = (Type.INT, Type.STRING, Type.BOOL)
+
+    def __init__(self, interpreter_ref):
+        super().__init__(MAP_DEF, ["K", "V"], interpreter_ref)
+
+    def methods(self):
+        return [
+            ("int", "size", (), self.__size),
+            ("bool", "contains", (("K", "key"),), self.__contains),
+            ("V", "get", (("K", "key"),), self.__get),
+            ("void", "put", (("K", "key"), ("V", "value")), self.__put),
+            ("bool", "remove", (("K", "key"),), self.__remove),
+        ]
+
+    def create_native_state(self, class_def):
+        return {}
+
+    def check_type_arguments(self, type_arguments):
+        key_type = type_arguments[0]
+        if key_type not in MapTClassDef.KEY_TYPES:
+            return Result.Err(
+                ErrorType.TYPE_ERROR,
+                f"Keys of {MAP_DEF} must be of type int, string or bool, not {key_type}"
+            )
+        return Result.Ok()
+
+    def __size(self, obj, line_num):
+        return Value(Type.INT, len(obj.native_state))
+
+    def __contains(self, obj, line_num, key):
+        return Value(Type.BOOL, to_key(key) in obj.native_state)
+
+    def __get(self, obj, line_num, key):
+        value_type = obj.class_def.type_arguments[1]
+        key = to_key(key)
+        if key not in obj.native_state:
+            # same default as an uninitialized field of type V
+            return get_default_value(value_type, self.interpreter_ref) if isinstance(value_type, Type) else Value(Type.NULL, None)
+        return from_element(value_type, obj.native_state[key])
+
+    def __put(self, obj, line_num, key, value):
+        obj.native_state[to_key(key)] = to_element(value)
+
+    def __remove(self, obj, line_num, key):
+        # whether or not the key was in the map
+        return Value(Type.BOOL, obj.native_state.pop(to_key(key), obj) is not obj)
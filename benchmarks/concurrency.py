@@ -0,0 +1,84 @@
+"""
+Stress test for running many interpreters at once in one process. Every program in
+the test directories, and a generated corpus whose programs all define classes of
+the same names, is run once on its own and then many times over across a pool of
+threads; any run whose output, error type or error line differs from the program's
+solo run is reported, and the exit status is 1 if there are any.
+
+Run from the repository root:
+    python3 -m benchmarks.concurrency --threads 16 --rounds 4
+"""
+
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from os.path import exists, splitext
+
+from benchmarks.generator import DIMENSIONS, write_corpus
+from differential import Configuration, TEST_DIRECTORIES, find_programs
+
+
+def load(path):
+    """Lines of the program at path and of the input next to it"""
+    with open(path, encoding="utf-8") as handle:
+        program = handle.readlines()
+    inp = []
+    if exists(splitext(path)[0] + ".in"):
+        with open(splitext(path)[0] + ".in", encoding="utf-8") as handle:
+            inp = [line.rstrip("\n") for line in handle]
+    return program, inp
+
+
+def stress(programs, threads=16, rounds=4, timeout=10):
+    """
+    The runs of programs, rounds times each across threads threads,
+    that behaved differently from a run of the same program on its own, and the
+    seconds the concurrent runs took
+    """
+    configuration = Configuration("default")
+    loaded = [(version, path, *load(path)) for version, path in programs]
+    expected = {
+        path: configuration.run(version, program, inp, timeout)[:2]
+        for version, path, program, inp in loaded
+    }
+
+    runs = [run for _ in range(rounds) for run in loaded]
+
+    def run(version, path, program, inp):
+        return path, configuration.run(version, program, inp, timeout)[:2]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lambda args: run(*args), runs))
+    elapsed = time.perf_counter() - start
+
+    mismatches = [
+        {"program": path, "expected": expected[path], "got": result}
+        for path, result in results
+        if result != expected[path]
+    ]
+    return mismatches, elapsed
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Run many interpreters at once in a thread pool")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=4, help="how many times each program is run")
+    parser.add_argument("--generate", type=int, default=20, help="how many generated programs to add")
+    parser.add_argument("--timeout", type=float, default=10, help="seconds before a run is stopped")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as generated:
+        write_corpus(generated, args.generate, randomize=True, **DIMENSIONS)
+        all_programs = []
+        for test_version in TEST_DIRECTORIES:
+            all_programs += find_programs(test_version, [generated] if test_version == "3" else [])
+        found_mismatches, seconds = stress(all_programs, args.threads, args.rounds, args.timeout)
+
+    for mismatch in found_mismatches:
+        print(f"MISMATCH {mismatch['program']}: expected {mismatch['expected']}, got {mismatch['got']}")
+    print(f"{len(all_programs) * args.rounds - len(found_mismatches)}/{len(all_programs) * args.rounds} "
+          f"concurrent runs matched in {seconds:.3f}s across {args.threads} threads")
+    sys.exit(1 if found_mismatches else 0)
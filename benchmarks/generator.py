@@ -0,0 +1,216 @@
+"""
+Generator of valid Brewin# programs of tunable size, with their expected output,
+for stressing the parser, class definitions, templates and execution at sizes the
+hand-written tests never reach.
+
+Run from the repository root, to write a corpus of programs and .exp files:
+    python3 -m benchmarks.generator write path/to/dir --count 20 --randomize
+or to time (and with --memory, measure) programs growing along one dimension:
+    python3 -m benchmarks.generator scale classes --values 1 2 4 8 16
+
+A template nesting of n defines templated classes wrap0 to wrap(n-1), each holding
+an instance of the one before it instantiated with the same type, and runs values
+through wrap(n-1)@int and wrap(n-1)@string. Nested type arguments like wrap@wrap@int
+are not valid Brewin#, so nesting is expressed this way instead.
+Each level of recursion takes several Python frames, so recursion depths beyond a
+hundred or so run out of Python's recursion limit.
+"""
+
+import random
+import sys
+from argparse import ArgumentParser
+from os import makedirs
+from os.path import join
+
+DIMENSIONS = {
+    "classes": 3,
+    "inheritance_depth": 3,
+    "methods": 2,
+    "template_nesting": 2,
+    "loop_trips": 10,
+    "recursion_depth": 20,
+}
+
+
+def generate_program(classes=3, inheritance_depth=3, methods=2, template_nesting=2, loop_trips=10,
+                     recursion_depth=20, seed=0):
+    """
+    A Brewin# program and its expected output, as lists of lines
+    There are classes families of classes, each an inheritance chain inheritance_depth
+    classes deep below its base, and each class defines methods methods of its own
+    main calls every method of the most derived class of each family loop_trips times
+    """
+    rng = random.Random(seed)
+    source = []
+    expected = []
+
+    if template_nesting > 0:
+        source += [
+            "(tclass wrap0 (T)",
+            "  (field T value)",
+            "  (method void put ((T v)) (set value v))",
+            "  (method T take () (return value))",
+            ")",
+        ]
+    for level in range(1, template_nesting):
+        source += [
+            f"(tclass wrap{level} (T)",
+            f"  (field wrap{level - 1}@T inner null)",
+            f"  (method void put ((T v)) (begin (set inner (new wrap{level - 1}@T)) (call inner put v)))",
+            "  (method T take () (return (call inner take)))",
+            ")",
+        ]
+
+    # family -> [(level, method index, a, b)] for methods computing a * x + b
+    family_methods = []
+    for family in range(classes):
+        family_methods.append([])
+        for level in range(inheritance_depth + 1):
+            parent = f" inherits f{family}_{level - 1}" if level > 0 else ""
+            source.append(f"(class f{family}_{level}{parent}")
+            if level == 0:
+                source += [
+                    "  (field int acc 0)",
+                    "  (method void add ((int x)) (set acc (+ acc x)))",
+                    "  (method int total () (return acc))",
+                ]
+            for index in range(methods):
+                a, b = rng.randint(1, 9), rng.randint(-9, 9)
+                family_methods[family].append((level, index, a, b))
+                source.append(f"  (method int m{level}_{index} ((int x)) (return (+ (* x {a}) {b})))")
+            source.append(")")
+
+    main_locals = ["(int i 0)"]
+    main_body = []
+    for family, family_method_list in enumerate(family_methods):
+        obj = f"obj{family}"
+        main_locals.append(f"(f{family}_{inheritance_depth} {obj} null)")
+        main_body += [
+            f"      (set {obj} (new f{family}_{inheritance_depth}))",
+            "      (set i 0)",
+            f"      (while (< i {loop_trips})",
+            "        (begin",
+        ]
+        main_body += [
+            f"          (call {obj} add (call {obj} m{level}_{index} i))"
+            for level, index, _, _ in family_method_list
+        ]
+        main_body += [
+            "          (set i (+ i 1))",
+            "        )",
+            "      )",
+            f"      (print (call {obj} total))",
+        ]
+        expected.append(str(sum(a * i + b for _, _, a, b in family_method_list for i in range(loop_trips))))
+
+    if template_nesting > 0:
+        wrapper = f"wrap{template_nesting - 1}"
+        number, text = rng.randint(0, 1000), f"s{rng.randint(0, 1000)}"
+        main_locals += [f"({wrapper}@int int_box null)", f"({wrapper}@string string_box null)"]
+        main_body += [
+            f"      (set int_box (new {wrapper}@int))",
+            f"      (call int_box put {number})",
+            "      (print (call int_box take))",
+            f"      (set string_box (new {wrapper}@string))",
+            f"      (call string_box put \"{text}\")",
+            "      (print (call string_box take))",
+        ]
+        expected += [str(number), text]
+
+    main_body.append(f"      (print (call me sum_to {recursion_depth}))")
+    expected.append(str(recursion_depth * (recursion_depth + 1) // 2))
+
+    source += [
+        "(class main",
+        "  (method int sum_to ((int n))",
+        "    (begin",
+        "      (if (== n 0) (return 0))",
+        "      (return (+ n (call me sum_to (- n 1))))",
+        "    )",
+        "  )",
+        "  (method void main ()",
+        f"    (let ({' '.join(main_locals)})",
+        *main_body,
+        "    )",
+        "  )",
+        ")",
+    ]
+
+    return source, expected
+
+
+def write_corpus(directory, count, seed=0, randomize=False, **dimensions):
+    """
+    Write count programs to directory as gen_N.brewin with their expected output in
+    gen_N.exp; with randomize, each dimension of each program is drawn from 0 up to
+    the given size (at least 1 for classes)
+    """
+    rng = random.Random(seed)
+    makedirs(directory, exist_ok=True)
+    for number in range(count):
+        sizes = dict(dimensions)
+        if randomize:
+            sizes = {name: rng.randint(1 if name == "classes" else 0, size) for name, size in dimensions.items()}
+        source, expected = generate_program(**sizes, seed=seed + number)
+
+        with open(join(directory, f"gen_{number}.brewin"), "w", encoding="utf-8") as handle:
+            handle.write("\n".join(source) + "\n")
+        with open(join(directory, f"gen_{number}.exp"), "w", encoding="utf-8") as handle:
+            handle.write("\n".join(expected) + "\n")
+
+
+def scale(dimension, values, repeat=3, memory=False, **dimensions):
+    """
+    Lines of comma-separated values of the size of programs growing along dimension,
+    and how long they take to run (median of repeat runs), and with memory how much
+    memory they use at peak
+    """
+    from benchmarks.suite import measure_workload, time_workload
+
+    lines = [f"{dimension},source_lines,median_seconds" + (",peak_bytes" if memory else "")]
+    for value in values:
+        source, expected = generate_program(**{**dimensions, dimension: value})
+        program = "\n".join(source)
+        times = sorted(time_workload(program, expected) for _ in range(repeat))
+        line = f"{value},{len(source)},{times[len(times) // 2]:.6f}"
+        if memory:
+            line += f",{measure_workload(program, expected)['peak_bytes']}"
+        lines.append(line)
+        print(line, file=sys.stderr)
+
+    return lines
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    write_parser = commands.add_parser("write", help="write generated programs and their expected output")
+    write_parser.add_argument("directory")
+    write_parser.add_argument("--count", type=int, default=10)
+    write_parser.add_argument("--seed", type=int, default=0)
+    write_parser.add_argument("--randomize", action="store_true", help="draw each program's sizes up to the given ones")
+
+    scale_parser = commands.add_parser("scale", help="time programs growing along one dimension, as CSV")
+    scale_parser.add_argument("dimension", choices=list(DIMENSIONS))
+    scale_parser.add_argument("--values", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    scale_parser.add_argument("--repeat", type=int, default=3)
+    scale_parser.add_argument("--memory", action="store_true", help="also measure peak memory with tracemalloc")
+    scale_parser.add_argument("--output", help="write the CSV to this file instead of stdout")
+
+    for command_parser in (write_parser, scale_parser):
+        for name, default in DIMENSIONS.items():
+            command_parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+
+    args = parser.parse_args()
+    sizes = {name: getattr(args, name) for name in DIMENSIONS}
+
+    if args.command == "write":
+        write_corpus(args.directory, args.count, args.seed, args.randomize, **sizes)
+    else:
+        csv = "\n".join(scale(args.dimension, args.values, args.repeat, args.memory, **sizes)) + "\n"
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(csv)
+        else:
+            sys.stdout.write(csv)
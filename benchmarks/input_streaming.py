@@ -0,0 +1,81 @@
+"""
+Benchmark for reading input: a fully materialized list of lines against a
+StreamReader, with and without the pre-parsed int fast path. Reports time
+and peak memory for a program summing numbers read with inputi.
+
+Run from the repository root:
+    python3 -m benchmarks.input_streaming
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+from interpreterv3 import Interpreter
+from reader import FileReader
+
+
+PROGRAM = """
+(class main
+  (method void main ()
+    (let ((int total 0) (int x 0) (int i 0))
+      (while (< i {num_lines})
+        (begin
+          (inputi x)
+          (set total (+ total x))
+          (set i (+ i 1))
+        )
+      )
+      (print total)
+    )
+  )
+)
+"""
+
+
+def read_list(path):
+    with open(path, encoding="utf-8") as handle:
+        return list(map(lambda x: x.rstrip("\n"), handle.readlines()))
+
+
+def measure(make_input, path, num_lines):
+    program = PROGRAM.format(num_lines=num_lines).splitlines()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    inp = make_input(path)
+    interpreter = Interpreter(console_output=False, inp=inp)
+    interpreter.run(program)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if isinstance(inp, FileReader):
+        inp.close()
+    assert interpreter.get_output() == [str(num_lines * (num_lines - 1) // 2)]
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000])
+    args = parser.parse_args()
+
+    modes = {
+        "list": read_list,
+        "stream": lambda path: FileReader(path),
+        "stream + ints": lambda path: FileReader(path, parse_ints=True),
+    }
+
+    print(f"{'lines':>8} {'mode':<14} {'time (s)':>9} {'peak (KiB)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_lines in args.sizes:
+            path = os.path.join(tmp, "input.txt")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.writelines(f"{i}\n" for i in range(num_lines))
+
+            for name, make_input in modes.items():
+                elapsed, peak = measure(make_input, path, num_lines)
+                print(f"{num_lines:>8} {name:<14} {elapsed:>9.3f} {peak / 1024:>11.0f}")
@@ -0,0 +1,83 @@
+"""
+Benchmark for output throughput under each output sink and output log setting.
+Measures a print-heavy Brewin program, and Interpreter.output on its own to
+isolate the cost of the sink from the cost of interpreting the program.
+
+Run from the repository root:
+    python3 -m benchmarks.output_throughput
+"""
+
+import os
+import tempfile
+import time
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+
+from interpreterv3 import Interpreter
+from sink import StreamSink, FileSink, CallbackSink
+
+
+PROGRAM = """
+(class main
+  (method void main ()
+    (let ((int i 0))
+      (while (< i {num_lines})
+        (begin
+          (print "line " i)
+          (set i (+ i 1))
+        )
+      )
+    )
+  )
+)
+"""
+
+
+def make_modes(devnull, path):
+    # name -> function making an Interpreter for that mode
+    return {
+        "print + log": lambda: Interpreter(),
+        "stdout + log": lambda: Interpreter(output_sink=StreamSink(devnull)),
+        "stdout, no log": lambda: Interpreter(output_sink=StreamSink(devnull), output_log_size=0),
+        "stdout + ring(1000)": lambda: Interpreter(output_sink=StreamSink(devnull), output_log_size=1000),
+        "file, no log": lambda: Interpreter(output_sink=FileSink(path), output_log_size=0),
+        "callback, no log": lambda: Interpreter(output_sink=CallbackSink(lambda line: None), output_log_size=0),
+    }
+
+
+def time_program(make_interpreter, num_lines):
+    program = PROGRAM.format(num_lines=num_lines).splitlines()
+    interpreter = make_interpreter()
+
+    start = time.perf_counter()
+    interpreter.run(program)
+    return time.perf_counter() - start
+
+
+def time_output(make_interpreter, num_lines):
+    interpreter = make_interpreter()
+    lines = [f"line {i}" for i in range(num_lines)]
+
+    start = time.perf_counter()
+    for line in lines:
+        interpreter.output(line)
+    if interpreter.output_sink is not None:
+        interpreter.output_sink.flush()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--program-lines", type=int, default=20000)
+    parser.add_argument("--output-lines", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull, tempfile.TemporaryDirectory() as tmp, redirect_stdout(devnull):
+        results = [
+            (name, time_program(make_interpreter, args.program_lines), time_output(make_interpreter, args.output_lines))
+            for name, make_interpreter in make_modes(devnull, os.path.join(tmp, "out.txt")).items()
+        ]
+
+    print(f"{'mode':<22} {'program (s)':>11} {'output (s)':>11} {'lines/s':>12}")
+    for name, program_time, output_time in results:
+        print(f"{name:<22} {program_time:>11.3f} {output_time:>11.3f} {args.output_lines / output_time:>12.0f}")
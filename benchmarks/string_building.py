@@ -0,0 +1,70 @@
+"""
+Benchmark for building a string by repeated concatenation in a while loop.
+With Rope-backed strings the time per iteration should stay flat as the
+number of iterations grows; with eager concatenation it grows linearly.
+
+Run from the repository root:
+    python3 -m benchmarks.string_building
+"""
+
+import time
+from argparse import ArgumentParser
+
+from interpreterv3 import Interpreter
+from btypes import Type
+from value import Value
+
+
+PROGRAM = """
+(class main
+  (method void main ()
+    (let ((string out "") (int i 0))
+      (while (< i {iterations})
+        (begin
+          (set out (+ out "{chunk}"))
+          (set i (+ i 1))
+        )
+      )
+      (print out)
+    )
+  )
+)
+"""
+
+
+class EagerInterpreter(Interpreter):
+    """
+    Interpreter that concatenates strings eagerly, as a baseline
+    """
+    binary_ops = dict(Interpreter.binary_ops)
+    binary_ops[Type.STRING] = dict(Interpreter.binary_ops[Type.STRING])
+    binary_ops[Type.STRING]["+"] = lambda a, b: Value(Type.STRING, str(a.value) + str(b.value))
+
+
+def time_run(interpreter_class, iterations, chunk):
+    program = PROGRAM.format(iterations=iterations, chunk=chunk).splitlines()
+    interpreter = interpreter_class(console_output=False)
+
+    start = time.perf_counter()
+    interpreter.run(program)
+    elapsed = time.perf_counter() - start
+
+    assert interpreter.get_output() == [chunk * iterations]
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 4000, 8000, 16000])
+    parser.add_argument("--chunk-length", type=int, default=200)
+    args = parser.parse_args()
+
+    chunk = "x" * args.chunk_length
+    print(f"{'iterations':>10} {'rope (s)':>10} {'us/iter':>8} {'eager (s)':>10} {'us/iter':>8}")
+    for iterations in args.sizes:
+        rope_time = time_run(Interpreter, iterations, chunk)
+        eager_time = time_run(EagerInterpreter, iterations, chunk)
+        print(
+            f"{iterations:>10} {rope_time:>10.3f} {rope_time / iterations * 1e6:>8.1f} "
+            f"{eager_time:>10.3f} {eager_time / iterations * 1e6:>8.1f}"
+        )
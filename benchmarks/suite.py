@@ -0,0 +1,587 @@
+"""
+Performance suite of parameterized Brewin# workloads. Each workload is run a few
+times after warming up, and the medians and variances are reported as JSON; two
+reports can then be compared to flag regressions.
+
+Run from the repository root:
+    python3 -m benchmarks.suite run --output before.json
+    python3 -m benchmarks.suite run --output after.json
+    python3 -m benchmarks.suite compare before.json after.json
+
+With --memory, each workload is also run once under tracemalloc to measure its
+memory use, and compare flags memory regressions too.
+"""
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from os.path import basename
+
+from bparser import BParser
+from interpreterv3 import Interpreter
+
+
+FIB_PROGRAM = """
+(class main
+  (method int fib ((int n))
+    (begin
+      (if (< n 2) (return n))
+      (return (+ (call me fib (- n 1)) (call me fib (- n 2))))
+    )
+  )
+  (method void main ()
+    (print (call me fib {n}))
+  )
+)
+"""
+
+# test_ll4 scaled up: build a list, then n times copy it recursively, reverse it and sum it
+# the recursion in copy_helper is as deep as the list is long, so length stays modest
+LINKED_LIST_PROGRAM = """
+(class node
+  (field node next null)
+  (field int val 0)
+  (method void set_val ((int new_val)) (set val new_val))
+  (method int get_val () (return val))
+  (method void set_next ((node new_next)) (set next new_next))
+  (method node get_next () (return next))
+  (method node copy () (return (call me copy_helper me)))
+  (method node copy_helper ((node head))
+    (let ((node out null))
+      (if (== head null) (return out))
+      (set out (new node))
+      (call out set_val (call head get_val))
+      (call out set_next (call me copy_helper (call head get_next)))
+      (return out)
+    )
+  )
+  (method node reverse ()
+    (let ((node cur null) (node next_node null) (node prev null))
+      (set cur (call me copy))
+      (while (!= cur null)
+        (begin
+          (set next_node (call cur get_next))
+          (call cur set_next prev)
+          (set prev cur)
+          (set cur next_node)
+        )
+      )
+      (return prev)
+    )
+  )
+)
+
+(class main
+  (method int sum ((node head))
+    (let ((int total 0))
+      (while (!= null head)
+        (begin
+          (set total (+ total (call head get_val)))
+          (set head (call head get_next))
+        )
+      )
+      (return total)
+    )
+  )
+  (method void main ()
+    (let ((node head null) (node new_node null) (int i 0) (int total 0))
+      (while (< i {length})
+        (begin
+          (set new_node (new node))
+          (call new_node set_val i)
+          (call new_node set_next head)
+          (set head new_node)
+          (set i (+ i 1))
+        )
+      )
+      (set i 0)
+      (while (< i {n})
+        (begin
+          (set total (+ total (call me sum (call head copy))))
+          (set total (+ total (call (call head reverse) get_val)))
+          (set i (+ i 1))
+        )
+      )
+      (print total)
+    )
+  )
+)
+"""
+
+STRING_PROGRAM = """
+(class main
+  (method void main ()
+    (let ((string s "") (int i 0))
+      (while (< i {n})
+        (begin
+          (set s (+ s "ab"))
+          (set i (+ i 1))
+        )
+      )
+      (print (== s ""))
+    )
+  )
+)
+"""
+
+# user-defined templated stacks alongside built-in arrays and maps
+TEMPLATE_PROGRAM = """
+(tclass cell (T)
+  (field T value)
+  (field cell@T next null)
+  (method void init ((T v) (cell@T n)) (begin (set value v) (set next n)))
+  (method T get_value () (return value))
+  (method cell@T get_next () (return next))
+)
+
+(tclass stack (T)
+  (field cell@T top null)
+  (field int size 0)
+  (method void push ((T v))
+    (let ((cell@T c null))
+      (set c (new cell@T))
+      (call c init v top)
+      (set top c)
+      (set size (+ size 1))
+    )
+  )
+  (method T pop ()
+    (let ((T v))
+      (set v (call top get_value))
+      (set top (call top get_next))
+      (set size (- size 1))
+      (return v)
+    )
+  )
+  (method bool empty () (return (== size 0)))
+)
+
+(class main
+  (method void main ()
+    (let ((stack@int ints null) (stack@string strings null) (array@int squares null)
+          (map@int@int seen null) (int i 0) (int total 0))
+      (set ints (new stack@int))
+      (set strings (new stack@string))
+      (set squares (new array@int))
+      (set seen (new map@int@int))
+      (while (< i {n})
+        (begin
+          (call ints push i)
+          (call strings push "x")
+          (call squares append (* i i))
+          (call seen put (% i 97) i)
+          (set i (+ i 1))
+        )
+      )
+      (while (! (call ints empty))
+        (begin
+          (set total (+ total (call ints pop)))
+          (call strings pop)
+        )
+      )
+      (print total)
+      (print (call squares get (- {n} 1)))
+      (print (call seen size))
+    )
+  )
+)
+"""
+
+EXCEPTION_PROGRAM = """
+(class main
+  (method void thrower ((int depth))
+    (begin
+      (if (== depth 0) (throw "boom"))
+      (call me thrower (- depth 1))
+    )
+  )
+  (method void main ()
+    (let ((int i 0) (int caught 0))
+      (while (< i {n})
+        (begin
+          (try
+            (call me thrower {depth})
+            (set caught (+ caught 1))
+          )
+          (set i (+ i 1))
+        )
+      )
+      (print caught)
+    )
+  )
+)
+"""
+
+
+def fib(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def fib_workload(n=16):
+    return FIB_PROGRAM.format(n=n), [str(fib(n))]
+
+
+def linked_list_workload(n=10, length=100):
+    return LINKED_LIST_PROGRAM.format(n=n, length=length), [str(n * length * (length - 1) // 2)]
+
+
+def string_workload(n=2000):
+    return STRING_PROGRAM.format(n=n), ["false"]
+
+
+def template_workload(n=500):
+    return TEMPLATE_PROGRAM.format(n=n), [str(n * (n - 1) // 2), str((n - 1) ** 2), str(min(n, 97))]
+
+
+def inheritance_workload(n=500, depth=12):
+    # a chain of classes, each overriding nothing, so every call resolves at the base
+    classes = ["(class level0 (field int count 0) (method void bump () (set count (+ count 1)))"
+               " (method int get () (return count)))"]
+    for level in range(1, depth + 1):
+        classes.append(f"(class level{level} inherits level{level - 1} (method int depth () (return {level})))")
+    classes.append(f"""
+(class main
+  (method void main ()
+    (let ((level{depth} obj null) (int i 0))
+      (set obj (new level{depth}))
+      (while (< i {n})
+        (begin
+          (call obj bump)
+          (set i (+ i 1))
+        )
+      )
+      (print (call obj get))
+    )
+  )
+)""")
+    return "\n".join(classes), [str(n)]
+
+
+def exception_workload(n=300, depth=10):
+    return EXCEPTION_PROGRAM.format(n=n, depth=depth), [str(n)]
+
+
+def parse_workload(n=200):
+    # many copies of the linked list program's node class, only parsed
+    node_class = LINKED_LIST_PROGRAM.split("(class main")[0]
+    return "\n".join(node_class.replace("node", f"node{i}") for i in range(n)), None
+
+
+# name -> (function returning the program and expected output, default parameters)
+# a workload whose expected output is None is only parsed
+WORKLOADS = {
+    "fib": (fib_workload, {"n": 16}),
+    "linked_list": (linked_list_workload, {"n": 10, "length": 100}),
+    "string_building": (string_workload, {"n": 2000}),
+    "template_containers": (template_workload, {"n": 500}),
+    "deep_inheritance": (inheritance_workload, {"n": 500, "depth": 12}),
+    "exception_storm": (exception_workload, {"n": 300, "depth": 10}),
+    "parse_only": (parse_workload, {"n": 200}),
+}
+
+
+def time_workload(program, expected):
+    """Seconds to run (or, without expected output, parse) program once"""
+    lines = program.splitlines()
+    if expected is None:
+        start = time.perf_counter()
+        status, parsed = BParser.parse(lines)
+        elapsed = time.perf_counter() - start
+        assert status, parsed
+        return elapsed
+
+    interpreter = Interpreter(console_output=False, inp=[])
+    start = time.perf_counter()
+    interpreter.run(lines)
+    elapsed = time.perf_counter() - start
+    assert interpreter.get_output() == expected, interpreter.get_output()
+    return elapsed
+
+
+# where allocations come from, by the file allocating them
+ALLOCATION_SOURCES = {
+    "bparser.py": "parser",
+    "classdef.py": "ClassDef",
+    "tclassdef.py": "ClassDef",
+    "native.py": "ClassDef",
+    "brewin_object.py": "Object",
+    "method.py": "Object",
+    "env.py": "Object",
+    "field.py": "Field/Value",
+    "value.py": "Field/Value",
+}
+
+
+def count_tokens(parsed):
+    pending = [parsed]
+    tokens = 0
+    while pending:
+        for item in pending.pop():
+            if isinstance(item, list):
+                pending.append(item)
+            else:
+                tokens += 1
+    return tokens
+
+
+def allocation_sources(statistics_by_file):
+    """Bytes allocated by each source, from tracemalloc statistics grouped by filename"""
+    sources = {}
+    for stat in statistics_by_file:
+        source = ALLOCATION_SOURCES.get(basename(stat.traceback[0].filename), "other")
+        sources[source] = sources.get(source, 0) + getattr(stat, "size_diff", stat.size)
+    return sources
+
+
+def count_instantiations(interpreter, on_instantiate=None):
+    """
+    Count the Objects interpreter instantiates by class, leaving out the base class
+    parts instantiated along with them; on_instantiate, if given, is called after each
+    """
+    created = {}
+    depth = [0]
+    instantiate_class = interpreter.instantiate_class
+
+    def counting_instantiate_class(class_name, line_num=None):
+        if depth[0] == 0:
+            created[class_name] = created.get(class_name, 0) + 1
+        depth[0] += 1
+        try:
+            obj = instantiate_class(class_name, line_num)
+        finally:
+            depth[0] -= 1
+        if on_instantiate is not None:
+            on_instantiate()
+        return obj
+
+    # Object instantiates classes through its interpreter, so this catches every instance;
+    # deleting the attribute afterwards stops counting
+    interpreter.instantiate_class = counting_instantiate_class
+    return created
+
+
+class PeakSources:
+    """
+    Allocations by source close to the peak of traced memory: a new breakdown is
+    taken whenever traced memory has grown by growth times since the last one, so
+    the last breakdown is from within that factor of the peak
+    """
+    def __init__(self, growth=1.1):
+        self.growth = growth
+        self.bytes = 0
+        self.sources = {}
+
+    def update(self):
+        current = tracemalloc.get_traced_memory()[0]
+        if current > self.bytes * self.growth:
+            self.bytes = current
+            self.sources = allocation_sources(tracemalloc.take_snapshot().statistics("filename"))
+
+
+def measure_instances(interpreter, created):
+    """
+    Bytes per Object and per Field, averaged over every Object in created (class name
+    -> number of instances), found by instantiating one more of each class. An Object's
+    bytes include its base class parts
+    """
+    objects = fields = object_bytes = field_bytes = 0
+    # the instances are kept until the end, so none is freed while measuring the next
+    instances = []
+    for class_name, count in list(created.items()):
+        # garbage collected part way through would count against the new Object
+        gc.collect()
+        gc.disable()
+        try:
+            before = tracemalloc.take_snapshot()
+            start = tracemalloc.get_traced_memory()[0]
+            obj = interpreter.instantiate_class(class_name)
+            size = tracemalloc.get_traced_memory()[0] - start
+            sources = allocation_sources(tracemalloc.take_snapshot().compare_to(before, "filename"))
+        finally:
+            gc.enable()
+        instances.append(obj)
+
+        num_fields = 0
+        part = obj
+        while part is not None:
+            num_fields += len(part.get_fields())
+            part = part.get_super()
+
+        objects += count
+        object_bytes += count * size
+        fields += count * num_fields
+        field_bytes += count * sources.get("Field/Value", 0)
+
+    return (object_bytes / objects if objects else None), (field_bytes / fields if fields else None)
+
+
+def measure_workload(program, expected):
+    """
+    Memory used by parsing and running (or, without expected output, only parsing)
+    program once, measured with tracemalloc. Steady-state memory is what the
+    interpreter still holds once the program has finished, and allocations breaks
+    it down by where it was allocated; peak_allocations is the same breakdown taken
+    as Objects are created, close to the peak
+    """
+    lines = program.splitlines()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        status, parsed = BParser.parse(lines)
+        assert status, parsed
+        parse_bytes = tracemalloc.get_traced_memory()[0]
+        memory = {"parse_bytes": parse_bytes, "bytes_per_token": parse_bytes / count_tokens(parsed)}
+        del parsed
+        if expected is None:
+            return memory
+
+        gc.collect()
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        interpreter = Interpreter(console_output=False, inp=[], output_log_size=len(expected))
+        peak_sources = PeakSources()
+        created = count_instantiations(interpreter, peak_sources.update)
+        interpreter.run(lines)
+        peak_sources.update()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        sources = allocation_sources(tracemalloc.take_snapshot().statistics("filename"))
+        del interpreter.instantiate_class
+        bytes_per_object, bytes_per_field = measure_instances(interpreter, created)
+    finally:
+        tracemalloc.stop()
+    assert list(interpreter.get_output()) == expected, interpreter.get_output()
+
+    memory.update({
+        "peak_bytes": peak - start,
+        "steady_bytes": current - start,
+        "objects": sum(created.values()),
+        "bytes_per_object": bytes_per_object,
+        "bytes_per_field": bytes_per_field,
+        "allocations": sources,
+        "peak_allocations": peak_sources.sources,
+    })
+    return memory
+
+
+def run_suite(names, repeat=5, warmup=1, scale=1.0, memory=False):
+    results = {}
+    for name in names:
+        make_workload, defaults = WORKLOADS[name]
+        # scale sizes, but not structural parameters like depth
+        params = {key: max(1, int(value * scale)) if key == "n" else value for key, value in defaults.items()}
+        program, expected = make_workload(**params)
+
+        for _ in range(warmup):
+            time_workload(program, expected)
+        times = [time_workload(program, expected) for _ in range(repeat)]
+
+        results[name] = {
+            "params": params,
+            "times": times,
+            "median": statistics.median(times),
+            "mean": statistics.mean(times),
+            "variance": statistics.variance(times) if len(times) > 1 else 0.0,
+            "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        }
+        print(f"{name:<20} median {results[name]['median'] * 1000:9.2f} ms  "
+              f"stdev {results[name]['stdev'] * 1000:8.2f} ms", file=sys.stderr)
+
+        if memory:
+            # tracemalloc slows everything down, so memory is measured in a run of its own
+            results[name]["memory"] = measure_workload(program, expected)
+            peak = results[name]["memory"].get("peak_bytes", results[name]["memory"]["parse_bytes"])
+            print(f"{'':<20} peak {peak / 1024:11.1f} KiB", file=sys.stderr)
+
+    return {"python": platform.python_version(), "repeat": repeat, "warmup": warmup, "results": results}
+
+
+MEMORY_METRICS = ("parse_bytes", "peak_bytes", "steady_bytes")
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Lines comparing the medians of two reports, and whether any workload regressed,
+    i.e. got slower by more than threshold (a fraction) and by more than its noise
+    """
+    lines = [f"{'workload':<20} {'before ms':>10} {'after ms':>10} {'change':>8}"]
+    regressed = False
+    for name, before in baseline["results"].items():
+        after = current["results"].get(name)
+        if after is None:
+            continue
+        if before["params"] != after["params"]:
+            lines.append(f"{name:<20} parameters differ, not compared")
+            continue
+
+        change = (after["median"] - before["median"]) / before["median"]
+        noise = before["stdev"] + after["stdev"]
+        flag = ""
+        if change > threshold and after["median"] - before["median"] > noise:
+            flag = "  REGRESSION"
+            regressed = True
+        lines.append(
+            f"{name:<20} {before['median'] * 1000:>10.2f} {after['median'] * 1000:>10.2f} {change * 100:>+7.1f}%{flag}"
+        )
+
+        # memory use is deterministic enough to compare without allowing for noise
+        for metric in MEMORY_METRICS:
+            before_bytes = before.get("memory", {}).get(metric)
+            after_bytes = after.get("memory", {}).get(metric)
+            if not before_bytes or after_bytes is None:
+                continue
+            change = (after_bytes - before_bytes) / before_bytes
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressed = True
+            lines.append(
+                f"{'  ' + metric:<20} {before_bytes / 1024:>8.1f}Ki {after_bytes / 1024:>8.1f}Ki {change * 100:>+7.1f}%{flag}"
+            )
+
+    return lines, regressed
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the workloads and print or save a JSON report")
+    run_parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--scale", type=float, default=1.0, help="multiply the size of each workload by this")
+    run_parser.add_argument("--memory", action="store_true", help="also measure memory use with tracemalloc")
+    run_parser.add_argument("--output", help="write the report to this file instead of stdout")
+
+    compare_parser = commands.add_parser("compare", help="compare two reports, exiting with 1 on a regression")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="fractional slowdown to flag")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run_suite(args.workloads, args.repeat, args.warmup, args.scale, args.memory)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=4)
+        else:
+            json.dump(report, sys.stdout, indent=4)
+            print()
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline_report = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current_report = json.load(f)
+        comparison, any_regressed = compare(baseline_report, current_report, args.threshold)
+        print("\n".join(comparison))
+        sys.exit(1 if any_regressed else 0)
@@ -0,0 +1,121 @@
+"""
+Benchmark for counting word occurrences, comparing a map@string@int against
+the linear scan over a linked list of entries that Brewin programs used before.
+The linked list version is quadratic in the number of distinct words.
+
+Run from the repository root:
+    python3 -m benchmarks.word_count
+"""
+
+import random
+import time
+from argparse import ArgumentParser
+
+from interpreterv3 import Interpreter
+
+
+MAP_PROGRAM = """
+(class main
+  (method void main ()
+    (let ((map@string@int counts null) (string word "") (int i 0))
+      (set counts (new map@string@int))
+      (while (< i {num_words})
+        (begin
+          (inputs word)
+          (call counts put word (+ 1 (call counts get word)))
+          (set i (+ i 1))
+        )
+      )
+      (print (call counts size))
+      (print (call counts get "{probe}"))
+    )
+  )
+)
+"""
+
+LINKED_LIST_PROGRAM = """
+(class entry
+  (field string word "")
+  (field int count 0)
+  (field entry next null)
+  (method void init ((string w) (entry n)) (begin (set word w) (set next n)))
+  (method string get_word () (return word))
+  (method int get_count () (return count))
+  (method void increment () (set count (+ count 1)))
+  (method entry get_next () (return next))
+)
+
+(class main
+  (field entry head null)
+  (field int size 0)
+
+  (method entry find ((string w))
+    (let ((entry cur null))
+      (set cur head)
+      (while (!= cur null)
+        (begin
+          (if (== (call cur get_word) w) (return cur))
+          (set cur (call cur get_next))
+        )
+      )
+      (return null)
+    )
+  )
+
+  (method void main ()
+    (let ((entry found null) (string word "") (int i 0))
+      (while (< i {num_words})
+        (begin
+          (inputs word)
+          (set found (call me find word))
+          (if (== found null)
+            (begin
+              (set found (new entry))
+              (call found init word head)
+              (set head found)
+              (set size (+ size 1))
+            )
+          )
+          (call found increment)
+          (set i (+ i 1))
+        )
+      )
+      (print size)
+      (print (call (call me find "{probe}") get_count))
+    )
+  )
+)
+"""
+
+
+def make_words(num_words, vocabulary_size, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(vocabulary_size)]
+    return [rng.choice(vocabulary) for _ in range(num_words)]
+
+
+def time_run(program_template, words):
+    program = program_template.format(num_words=len(words), probe=words[0]).splitlines()
+    interpreter = Interpreter(console_output=False, inp=words)
+
+    start = time.perf_counter()
+    interpreter.run(program)
+    elapsed = time.perf_counter() - start
+
+    expected = [str(len(set(words))), str(words.count(words[0]))]
+    assert interpreter.get_output() == expected, interpreter.get_output()
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 500, 1000, 2000])
+    parser.add_argument("--words-per-distinct", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'words':>8} {'distinct':>8} {'map (s)':>9} {'list (s)':>9}")
+    for num_words in args.sizes:
+        words = make_words(num_words, max(1, num_words // args.words_per_distinct))
+        map_time = time_run(MAP_PROGRAM, words)
+        list_time = time_run(LINKED_LIST_PROGRAM, words)
+        print(f"{num_words:>8} {len(set(words)):>8} {map_time:>9.3f} {list_time:>9.3f}")
@@ -0,0 +1,212 @@
+"""
+Statement and branch coverage for Brewin# programs. To run programs, merging their
+coverage into a data file, then report on it:
+    python3 brewin_coverage.py coverage.json --run v3/tests/*.brewin
+    python3 brewin_coverage.py coverage.json [--annotate path/to/program.brewin]
+"""
+
+import json
+import sys
+from argparse import ArgumentParser
+from os.path import exists, splitext
+from intbase import InterpreterBase
+
+# branches of an if, and of the condition of a while
+IF_BRANCHES = ("true", "false")
+WHILE_BRANCHES = ("body", "exit")
+
+
+class Coverage:
+    """
+    Counts how many times each statement of a program runs, and which way each if and
+    while goes, driven by Object
+    instrument tags the first token of each statement with a slot, the index of its
+    counter in hits, when the program is loaded; an if or while also has the two
+    slots after its own for its branches. Templated classes share the counters of
+    their template's statements
+    """
+    def __init__(self):
+        self.hits = []
+        # slot -> (0-based line, statement kind or branch)
+        self.slots = []
+
+    def instrument(self, parsed_program):
+        for parsed_class in parsed_program:
+            for member in parsed_class:
+                if isinstance(member, list) and member and member[0] == InterpreterBase.METHOD_DEF and len(member) > 4:
+                    self.__instrument_statement(member[4])
+
+        self.hits = [0] * len(self.slots)
+
+    def __instrument_statement(self, statement):
+        if not isinstance(statement, list) or not statement:
+            return
+
+        name = statement[0]
+        name.coverage_slot = len(self.slots)
+        self.slots.append((name.line_num, str(name)))
+
+        match name:
+            case InterpreterBase.IF_DEF:
+                self.slots += [(name.line_num, branch) for branch in IF_BRANCHES]
+                for block in statement[2:]:
+                    self.__instrument_statement(block)
+            case InterpreterBase.WHILE_DEF:
+                self.slots += [(name.line_num, branch) for branch in WHILE_BRANCHES]
+                for block in statement[2:]:
+                    self.__instrument_statement(block)
+            case InterpreterBase.BEGIN_DEF | InterpreterBase.TRY_DEF:
+                for block in statement[1:]:
+                    self.__instrument_statement(block)
+            case InterpreterBase.LET_DEF:
+                for block in statement[2:]:
+                    self.__instrument_statement(block)
+
+
+class CoverageData:
+    """
+    Coverage of any number of runs of any number of programs, by file
+    For each file, the hits of each statement, keyed by 1-based line and the index of
+    the statement among those starting on that line, and of each branch, keyed by
+    line and branch
+    """
+    def __init__(self):
+        self.files = {}
+
+    def add(self, path, coverage):
+        """Merge in the coverage of a run of the program at path"""
+        file_data = self.files.setdefault(path, {"statements": {}, "branches": {}})
+        statements_on_line = {}
+
+        for (line_num, label), hits in zip(coverage.slots, coverage.hits):
+            line = line_num + 1
+            if label in IF_BRANCHES or label in WHILE_BRANCHES:
+                counts, key = file_data["branches"], f"{line}:{label}"
+            else:
+                index = statements_on_line[line] = statements_on_line.get(line, -1) + 1
+                counts, key = file_data["statements"], f"{line}.{index}"
+            counts[key] = counts.get(key, 0) + hits
+
+    def merge(self, other):
+        for path, other_file in other.files.items():
+            file_data = self.files.setdefault(path, {"statements": {}, "branches": {}})
+            for kind in ("statements", "branches"):
+                for key, hits in other_file[kind].items():
+                    file_data[kind][key] = file_data[kind].get(key, 0) + hits
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"files": self.files}, handle, indent=4)
+
+    @staticmethod
+    def load(path):
+        data = CoverageData()
+        with open(path, encoding="utf-8") as handle:
+            data.files = json.load(handle)["files"]
+        return data
+
+    def summary(self):
+        """Lines of a table of statement and branch coverage per file"""
+        lines = [f"{'file':<48} {'statements':>12} {'stmt %':>7} {'branches':>10} {'branch %':>9}"]
+        totals = [0, 0, 0, 0]
+        for path in sorted(self.files):
+            counts = self.__counts(path)
+            totals = [total + count for total, count in zip(totals, counts)]
+            lines.append(self.__summary_line(path, *counts))
+
+        lines.append(self.__summary_line("total", *totals))
+        return lines
+
+    def annotate(self, path, program):
+        """
+        Lines of program (the lines of source at path), each prefixed with the hits of
+        its statements, '!!!' if a statement on it never ran, and the branches on it
+        that were never taken
+        """
+        file_data = self.files.get(path, {"statements": {}, "branches": {}})
+        statement_hits = {}
+        for key, hits in file_data["statements"].items():
+            statement_hits.setdefault(int(key.split(".")[0]), []).append(hits)
+        missed_branches = {}
+        for key, hits in file_data["branches"].items():
+            line, branch = key.split(":")
+            if not hits:
+                missed_branches.setdefault(int(line), []).append(branch)
+
+        lines = []
+        for line, source in enumerate(program, start=1):
+            hits = statement_hits.get(line)
+            if hits is None:
+                marker = ""
+            elif min(hits) == 0:
+                marker = "!!!"
+            else:
+                marker = str(max(hits))
+
+            annotated = f"{marker:>8}  {source.rstrip()}"
+            if line in missed_branches:
+                annotated += f"    <- never took: {', '.join(missed_branches[line])}"
+            lines.append(annotated)
+
+        return lines
+
+    def __counts(self, path):
+        file_data = self.files[path]
+        statements = file_data["statements"].values()
+        branches = file_data["branches"].values()
+        return (
+            sum(1 for hits in statements if hits), len(statements),
+            sum(1 for hits in branches if hits), len(branches)
+        )
+
+    @staticmethod
+    def __summary_line(path, covered_statements, statements, covered_branches, branches):
+        def percent(covered, total):
+            return f"{100 * covered / total:6.1f}%" if total else f"{'-':>7}"
+
+        return (
+            f"{path:<48} {f'{covered_statements}/{statements}':>12} {percent(covered_statements, statements)} "
+            f"{f'{covered_branches}/{branches}':>10} {percent(covered_branches, branches):>9}"
+        )
+
+
+def run_with_coverage(path, inp=None):
+    """
+    Run the program at path and return its Coverage, even if it errors out; input is
+    read from inp, a list of lines, or the .in file next to the program if there is one
+    """
+    from interpreterv3 import Interpreter
+
+    if inp is None and exists(splitext(path)[0] + ".in"):
+        with open(splitext(path)[0] + ".in", encoding="utf-8") as handle:
+            inp = [line.rstrip("\n") for line in handle]
+
+    with open(path, encoding="utf-8") as handle:
+        program = handle.readlines()
+
+    interpreter = Interpreter(False, inp if inp is not None else [], coverage=True)
+    try:
+        interpreter.run(program)
+    except RuntimeError:
+        pass
+    return interpreter.coverage
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Collect and report statement and branch coverage of Brewin# programs")
+    parser.add_argument("data", help="coverage data file; runs are merged into it if it exists")
+    parser.add_argument("--run", nargs="+", metavar="PROGRAM", help="run these programs and merge in their coverage")
+    parser.add_argument("--annotate", metavar="PROGRAM", help="print an annotated listing of this program")
+    args = parser.parse_args()
+
+    data = CoverageData.load(args.data) if exists(args.data) else CoverageData()
+    if args.run:
+        for program_path in args.run:
+            data.add(program_path, run_with_coverage(program_path))
+        data.save(args.data)
+
+    if args.annotate:
+        with open(args.annotate, encoding="utf-8") as f:
+            sys.stdout.write("".join(line + "\n" for line in data.annotate(args.annotate, f.readlines())))
+    else:
+        sys.stdout.write("".join(line + "\n" for line in data.summary()))
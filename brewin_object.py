@@ -3,7 +3,7 @@ from env import LexicalEnvironment
 from intbase import ErrorType, InterpreterBase
 from value import Value, get_default_value_as_brewin_literal, create_value
 from result import Result
-from btypes import Type, TypeRegistry, is_subclass_of
+from btypes import Type, is_subclass_of
 from field import Field
 from method import Method
 from classdef import FieldDef
@@ -23,6 +23,8 @@ class Object:
         self.__fields = {}
         self.__methods = {}
         self.__super = None
+        # Python-side storage for instances of built-in classes
+        self.native_state = class_def.create_native_state()
 
         # populates self.__fields
         self.__instantiate_fields()
@@ -44,6 +46,16 @@ class Object:
         
         return Result.Ok()
 
+    def get_fields(self):
+        return self.__fields
+
+    def get_methods(self):
+        return self.__methods
+
+    def get_super(self):
+        # the Object for the base class part of this object, or None
+        return self.__super
+
     def get_method(self, method_name, argument_types, line_num_of_call=None):
         # search for method in self; if not there, search super
         if method_name in self.__methods:
@@ -62,10 +74,6 @@ class Object:
         return self.__super.get_method(method_name, argument_types, line_num_of_call)
 
     def execute_method(self, method_name, arguments=[], line_num_of_call=None, me_field=None):
-        # create a new lexical environment for this method call,
-        # when you call a method, it cannot see the variables outside its scope
-        env = LexicalEnvironment()
-
         # assume arguments is a list of Field objects
         # also, when working with function params, need to perform type checking with the Values
         # the arguments hold, rather than the actual fields
@@ -75,9 +83,58 @@ class Object:
         # me should refer to the same object in derived classes
         if me_field is None:
             obj, method = self.get_method(method_name, argument_types, line_num_of_call)
-            env.set(InterpreterBase.ME_DEF, Field.from_value(Value(self.name, self)))
         else:
             obj, method = me_field.value.value.get_method(method_name, argument_types, line_num_of_call)
+
+        if self.interpreter_ref.cancel_token.cancelled:
+            self.interpreter_ref.cancel_token.abort(self.interpreter_ref, line_num_of_call)
+
+        budget = self.interpreter_ref.budget
+        if budget is not None:
+            self.__count_call(budget, line_num_of_call)
+
+        tracer = self.interpreter_ref.tracer
+        if tracer is not None:
+            tracer.method_enter(obj.class_def, method, line_num_of_call)
+
+        profiler = self.interpreter_ref.profiler
+        if profiler is None:
+            result = self.__run_method(obj, method, arguments, line_num_of_call, me_field)
+        else:
+            profiler.enter(obj.class_def, method)
+            try:
+                result = self.__run_method(obj, method, arguments, line_num_of_call, me_field)
+            finally:
+                profiler.exit()
+
+        if tracer is not None:
+            tracer.method_exit(obj.class_def, method, line_num_of_call)
+        if budget is not None:
+            budget.depth -= 1
+        return result
+
+    def __count_call(self, budget, line_num_of_call):
+        budget.calls += 1
+        budget.depth += 1
+        if budget.depth > budget.deepest:
+            budget.deepest = budget.depth
+
+        if budget.calls > budget.max_calls:
+            budget.exceed_calls(self.interpreter_ref, line_num_of_call)
+        if budget.depth > budget.max_depth:
+            budget.exceed_depth(self.interpreter_ref, line_num_of_call)
+
+    def __run_method(self, obj, method, arguments, line_num_of_call, me_field):
+        # self is the object the method was called on, obj is the object defining it
+        if method.native is not None:
+            return obj.__execute_native_method(method, arguments, line_num_of_call)
+
+        # create a new lexical environment for this method call,
+        # when you call a method, it cannot see the variables outside its scope
+        env = LexicalEnvironment()
+        if me_field is None:
+            env.set(InterpreterBase.ME_DEF, Field.from_value(Value(self.name, self), self.interpreter_ref))
+        else:
             env.set(InterpreterBase.ME_DEF, me_field)
 
         for formal_param, arg in zip(method.params_as_fields, arguments):
@@ -90,7 +147,7 @@ class Object:
                 )
 
             # create a copy of the method's field
-            if is_subclass_of(formal_param.type, Type.CLASS):
+            if is_subclass_of(formal_param.type, Type.CLASS, self.interpreter_ref):
                 # pass objects by reference, not by value
                 formal_param_field = formal_param
             else:
@@ -110,7 +167,7 @@ class Object:
         status, return_field = obj.__execute_statement(env, method.statement)
 
         # by default, return the default value for the return type
-        ret = Field(method.return_type)
+        ret = Field(method.return_type, self.interpreter_ref)
 
         # TODO: propagating exceptions upwards outside method calls?
         if status == Object.STATUS_EXCEPTION:
@@ -122,7 +179,7 @@ class Object:
         if status == Object.STATUS_RETURN:
             ret.set_to_field(return_field)
             # type check the return values
-            if not is_subclass_of(return_field.type, method.return_type):
+            if not is_subclass_of(return_field.type, method.return_type, self.interpreter_ref):
                 self.interpreter_ref.error(
                     ErrorType.TYPE_ERROR,
                     f"Mismatched types: expected {method.return_type} but got {return_field.type}",
@@ -134,9 +191,37 @@ class Object:
         
         return Object.STATUS_PROCEED, ret
     
+    def __execute_native_method(self, method, arguments, line_num_of_call):
+        # built-in methods take the argument Values directly; the signature was already
+        # checked by get_method, so no environment or parameter copies are needed
+        ret = Field(method.return_type, self.interpreter_ref)
+        return_value = method.native(self, line_num_of_call, *[arg.value for arg in arguments])
+
+        if return_value is not None:
+            ret.set_to_value(return_value)
+            if not ret.status.ok:
+                ret.status.line_num = line_num_of_call
+                self.interpreter_ref.error(*ret.status[1:])
+
+        return Object.STATUS_PROCEED, ret
+
     def __execute_statement(self, env, statement):
         name = statement[0]
 
+        budget = self.interpreter_ref.budget
+        if budget is not None:
+            budget.steps += 1
+            if budget.steps > budget.max_steps:
+                budget.exceed_steps(self.interpreter_ref, name.line_num)
+
+        tracer = self.interpreter_ref.tracer
+        if tracer is not None:
+            tracer.statement(name)
+
+        coverage = self.interpreter_ref.coverage
+        if coverage is not None:
+            coverage.hits[name.coverage_slot] += 1
+
         match name:
             case InterpreterBase.BEGIN_DEF:
                 return self.__execute_begin(env, statement)
@@ -175,7 +260,7 @@ class Object:
             if status == Object.STATUS_RETURN or status == Object.STATUS_EXCEPTION:
                 return status, return_field
         
-        return Object.STATUS_PROCEED, Field(Type.NOTHING)
+        return Object.STATUS_PROCEED, Field(Type.NOTHING, self.interpreter_ref)
 
     def __execute_set(self, env, code):
         # (set var expr)
@@ -185,7 +270,7 @@ class Object:
             return status, field
 
         self.__execute_set_aux(env, code[1], field, code[0].line_num)
-        return Object.STATUS_PROCEED, Field(Type.NOTHING)
+        return Object.STATUS_PROCEED, Field(Type.NOTHING, self.interpreter_ref)
 
     def __execute_if(self, env, code):
         condition = code[1]
@@ -205,12 +290,15 @@ class Object:
             )
         
         evaluated_condition = evaluated_condition.value.value
+        if self.interpreter_ref.coverage is not None:
+            self.interpreter_ref.coverage.hits[code[0].coverage_slot + (1 if evaluated_condition else 2)] += 1
+
         if evaluated_condition:
             return self.__execute_statement(env, if_block)
         elif else_block is not None:
             return self.__execute_statement(env, else_block)
         
-        return Object.STATUS_PROCEED, Field(Type.NOTHING)
+        return Object.STATUS_PROCEED, Field(Type.NOTHING, self.interpreter_ref)
     
     def __execute_while(self, env, code):
         # (while (cond) (statement))
@@ -232,6 +320,8 @@ class Object:
             
             # extract Value from Field, and value from Value
             proceed = evaluated_condition.value.value
+            if self.interpreter_ref.coverage is not None:
+                self.interpreter_ref.coverage.hits[code[0].coverage_slot + (1 if proceed else 2)] += 1
             if not proceed:
                 break
 
@@ -239,7 +329,10 @@ class Object:
             if status == Object.STATUS_RETURN or status == Object.STATUS_EXCEPTION:
                 return status, return_field
 
-        return Object.STATUS_PROCEED, Field(Type.NOTHING)
+            if self.interpreter_ref.cancel_token.cancelled:
+                self.interpreter_ref.cancel_token.abort(self.interpreter_ref, code[0].line_num)
+
+        return Object.STATUS_PROCEED, Field(Type.NOTHING, self.interpreter_ref)
 
     def __execute_call(self, env, code):
         return self.__execute_call_aux(env, code, code[0].line_num)
@@ -247,7 +340,7 @@ class Object:
     def __execute_return(self, env, code):
         if len(code) == 1:
             # return with no expression
-            out = Field(Type.NOTHING)
+            out = Field(Type.NOTHING, self.interpreter_ref)
         else:
             status, out = self.__evaluate_expression(env, code[1], code[0].line_num)
 
@@ -258,17 +351,17 @@ class Object:
 
     def __execute_inputi(self, env, code):
         var_name = code[1]
-        inp = int(self.interpreter_ref.get_input())
-        field = Field.from_value(Value(Type.INT, inp))
+        inp = self.interpreter_ref.get_input_int()
+        field = Field.from_value(Value(Type.INT, inp), self.interpreter_ref)
         self.__execute_set_aux(env, var_name, field, code[0].line_num)
-        return Object.STATUS_PROCEED, Field(Type.NOTHING)
+        return Object.STATUS_PROCEED, Field(Type.NOTHING, self.interpreter_ref)
     
     def __execute_inputs(self, env, code):
         var_name = code[1]
         inp = self.interpreter_ref.get_input()
-        field = Field.from_value(Value(Type.STRING, inp))
+        field = Field.from_value(Value(Type.STRING, inp), self.interpreter_ref)
         self.__execute_set_aux(env, var_name, field, code[0].line_num)
-        return Object.STATUS_PROCEED, Field(Type.NOTHING)
+        return Object.STATUS_PROCEED, Field(Type.NOTHING, self.interpreter_ref)
 
     def __execute_print(self, env, code):
         def convert_to_brewin_literal(val):
@@ -289,7 +382,7 @@ class Object:
 
         self.interpreter_ref.output(output)
 
-        return Object.STATUS_PROCEED, Field(Type.NOTHING)
+        return Object.STATUS_PROCEED, Field(Type.NOTHING, self.interpreter_ref)
 
     def __execute_let(self, env, code):
         # (let ( (t1 p1) (t2 p2) ... )
@@ -308,7 +401,7 @@ class Object:
                     local_type = local_var_def[0]
                     local_name = local_var_def[1]
                     local_initial_value = StringWithLineNumber(
-                        get_default_value_as_brewin_literal(local_type), local_type.line_num)
+                        get_default_value_as_brewin_literal(local_type, self.interpreter_ref), local_type.line_num)
                 case _:
                     local_type, local_name, local_initial_value = local_var_def
 
@@ -331,7 +424,7 @@ class Object:
 
             # local variables must have an initial value specified
             # and in Barista, they cannot be initialized with values of class fields
-            local_field = Field.from_field_def(local_as_field_def)
+            local_field = Field.from_field_def(local_as_field_def, self.interpreter_ref)
             if not local_field.status.ok:
                 local_field.status.line_num = let_kw.line_num
                 self.interpreter_ref.error(*local_field.status[1:])
@@ -344,7 +437,7 @@ class Object:
             if status == Object.STATUS_RETURN or status == Object.STATUS_EXCEPTION:
                 return status, return_field
         
-        return Object.STATUS_PROCEED, Field(Type.NOTHING)
+        return Object.STATUS_PROCEED, Field(Type.NOTHING, self.interpreter_ref)
 
     def __execute_throw(self, env, code):
         message = code[1]
@@ -360,7 +453,9 @@ class Object:
 
         if status == Object.STATUS_EXCEPTION:
             return status, evaluated_message
-        
+
+        if self.interpreter_ref.tracer is not None:
+            self.interpreter_ref.tracer.throw(code[0].line_num, evaluated_message.value.value)
         return Object.STATUS_EXCEPTION, evaluated_message
 
     def __execute_try(self, env, code):
@@ -372,6 +467,8 @@ class Object:
         
         # except a STATUS_EXCEPTION
         if status == Object.STATUS_EXCEPTION:
+            if self.interpreter_ref.tracer is not None:
+                self.interpreter_ref.tracer.catch(code[0].line_num, return_field.value.value)
             env = env.copy()
             env.set(InterpreterBase.EXCEPTION_VARIABLE_DEF, return_field)
             status, return_field = self.__execute_statement(env, catch_block)
@@ -382,7 +479,7 @@ class Object:
         elif status == Object.STATUS_RETURN:
             return status, return_field
         
-        return Object.STATUS_PROCEED, Field(Type.NOTHING)
+        return Object.STATUS_PROCEED, Field(Type.NOTHING, self.interpreter_ref)
 
     def __evaluate_expression(self, env, expr, line_num_of_expr):
         # returns a status and Field
@@ -399,7 +496,7 @@ class Object:
          
             if expr == InterpreterBase.SUPER_DEF:
                 if self.__super is not None:
-                    return Object.STATUS_PROCEED, Field.from_value(Value(self.__super.name, self.__super), InterpreterBase.SUPER_DEF)
+                    return Object.STATUS_PROCEED, Field.from_value(Value(self.__super.name, self.__super), self.interpreter_ref, InterpreterBase.SUPER_DEF)
                 
                 self.interpreter_ref.error(
                     ErrorType.TYPE_ERROR,
@@ -413,7 +510,7 @@ class Object:
                 self.interpreter_ref.error(*val_res[1:])
             
             val = val_res.unwrap()
-            return Object.STATUS_PROCEED, Field.from_value(val)
+            return Object.STATUS_PROCEED, Field.from_value(val, self.interpreter_ref)
         
         # otherwise an expression is an operator with arguments
         operator, *args = expr
@@ -438,11 +535,11 @@ class Object:
                 return stat2, operand2
 
             # Object types can only be operated on if they are sub / super classes of each other
-            if is_subclass_of(operand1.type, Type.CLASS) and is_subclass_of(operand2.type, Type.CLASS):
-                if (is_subclass_of(operand1.value.type, operand2.value.type) or is_subclass_of(operand2.value.type, operand1.value.type)) and \
-                    (is_subclass_of(operand1.type, operand2.type) or is_subclass_of(operand2.type, operand1.type)):
+            if is_subclass_of(operand1.type, Type.CLASS, self.interpreter_ref) and is_subclass_of(operand2.type, Type.CLASS, self.interpreter_ref):
+                if (is_subclass_of(operand1.value.type, operand2.value.type, self.interpreter_ref) or is_subclass_of(operand2.value.type, operand1.value.type, self.interpreter_ref)) and \
+                    (is_subclass_of(operand1.type, operand2.type, self.interpreter_ref) or is_subclass_of(operand2.type, operand1.type, self.interpreter_ref)):
                     ret = self.interpreter_ref.binary_ops[Type.CLASS][operator](operand1.value, operand2.value)
-                    return Object.STATUS_PROCEED, Field.from_value(ret)
+                    return Object.STATUS_PROCEED, Field.from_value(ret, self.interpreter_ref)
                 else:
                     self.interpreter_ref.error(
                         ErrorType.TYPE_ERROR,
@@ -467,7 +564,7 @@ class Object:
                 )
             
             ret = self.interpreter_ref.binary_ops[operand1.type][operator](operand1.value, operand2.value)
-            return Object.STATUS_PROCEED, Field.from_value(ret)
+            return Object.STATUS_PROCEED, Field.from_value(ret, self.interpreter_ref)
         
         if operator in self.interpreter_ref.unary_op_set:
             if len(args) != 1:
@@ -491,7 +588,7 @@ class Object:
                 )
             
             ret = self.interpreter_ref.unary_ops[operand.type][operator](operand.value)
-            return Object.STATUS_PROCEED, Field.from_value(ret)
+            return Object.STATUS_PROCEED, Field.from_value(ret, self.interpreter_ref)
 
         if operator == InterpreterBase.NEW_DEF:
             if len(args) != 1:
@@ -540,7 +637,7 @@ class Object:
     def __execute_new_aux(self, class_name, line_num_of_new=None):
         obj = self.interpreter_ref.instantiate_class(class_name, line_num_of_new)
         # the type of this value is the class's name
-        return Field.from_value(Value(class_name, obj))
+        return Field.from_value(Value(class_name, obj), self.interpreter_ref)
 
     def __execute_call_aux(self, env, expr, line_num_of_call=None):
         # expr is (call obj method arg1 arg2 ...)
@@ -557,7 +654,7 @@ class Object:
                     line_num_of_call
                 )
             obj = self.__super
-            me_field = Field.from_value(Value(obj.name, obj))
+            me_field = Field.from_value(Value(obj.name, obj), self.interpreter_ref)
         else:
             # evaluate_expression returns a Value object: this gets the actual value out of it
             status, obj_field = self.__evaluate_expression(env, obj_name, line_num_of_call)
@@ -588,15 +685,15 @@ class Object:
 
     def __instantiate_fields(self):
         for field_name, field_def in self.class_def.get_field_defs().items():
-            self.__fields[field_name] = Field.from_field_def(field_def)
+            self.__fields[field_name] = Field.from_field_def(field_def, self.interpreter_ref)
         
     def __instantiate_methods(self):
         for method_name, method_def in self.class_def.get_method_defs().items():
-            self.__methods[method_name] = Method(method_def)
+            self.__methods[method_name] = Method(method_def, self.interpreter_ref)
     
     def __possibly_instantiate_super(self):
         # assume existence checking has already been done in ClassDef
-        superclass = TypeRegistry.get_super(self.name).unwrap()
+        superclass = self.interpreter_ref.type_registry.get_super(self.name).unwrap()
 
         # if this class does in fact inherit from something
         if superclass != Type.CLASS:
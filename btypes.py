@@ -37,61 +37,57 @@ class Type(Enum):
 class TypeRegistry:
     """
     Class for holding types defined by creating custom Brewin classes
+    Each interpreter has its own, so interpreters never see each other's classes
     """
-    # register: subcls -> direct superclass of subcls
-    # Brewin++ does not support multiple inheritance
-    __register = {
-        Type.CLASS: None
-    }
-
-    @classmethod
-    def defines(cls, class_name):
-        return class_name in cls.__register
+    def __init__(self):
+        # register: subcls -> direct superclass of subcls
+        # Brewin++ does not support multiple inheritance
+        self.__register = {
+            Type.CLASS: None
+        }
+
+    def defines(self, class_name):
+        return class_name in self.__register
     
-    @classmethod
-    def get_super(cls, class_name):
-        if not cls.defines(class_name):
+    def get_super(self, class_name):
+        if not self.defines(class_name):
             return Result.Err(ErrorType.TYPE_ERROR, f"No class named {class_name} found")
         
-        return Result.Ok(cls.__register[class_name])
+        return Result.Ok(self.__register[class_name])
 
-    @classmethod
-    def get_all_supers(cls, class_name):
+    def get_all_supers(self, class_name):
         if class_name == Type.NULL:
-            return Result.Ok(cls.entries())
+            return Result.Ok(self.entries())
 
-        res = cls.get_super(class_name)
+        res = self.get_super(class_name)
         if not res.ok:
             return res
         
         if res.unwrap() is None:
             return Result.Ok(set())
         else:
-            super_sups_res = cls.get_all_supers(res.unwrap())
+            super_sups_res = self.get_all_supers(res.unwrap())
             if not super_sups_res.ok:
                 return super_sups_res
             
             return Result.Ok(set([res.unwrap()]) | super_sups_res.unwrap())
     
     
-    @classmethod
-    def register(cls, class_name, inherits):
-        if cls.defines(class_name):
+    def register(self, class_name, inherits):
+        if self.defines(class_name):
             return Result.Err(ErrorType.TYPE_ERROR, f"Attempted duplicate definition of type {class_name}")
         
-        if not cls.defines(inherits):
+        if not self.defines(inherits):
             return Result.Err(ErrorType.TYPE_ERROR, f"Attempt to inherit from unknown type {inherits}")
         
-        cls.__register[class_name] = inherits
+        self.__register[class_name] = inherits
         return Result.Ok()
     
-    @classmethod
-    def entries(cls):
-        return set(cls.__register.keys())
+    def entries(self):
+        return set(self.__register.keys())
     
-    @classmethod
-    def clear(cls):
-        cls.__register = {
+    def clear(self):
+        self.__register = {
             Type.CLASS: None
         }
         return Result.Ok()
@@ -102,45 +98,44 @@ class TClassRegistry:
     Class for holding templated types defined using tclass
     These aren't actual types; but when instantiated with the correct number
     of type arguments, and with valid type arguments, they become types
+    Like TypeRegistry, each interpreter has its own
     """
-    # register: tcls -> number of type parameters to tcls
-    __register = {}
+    def __init__(self):
+        # register: tcls -> number of type parameters to tcls
+        self.__register = {}
 
-    @classmethod
-    def defines(cls, tclass_name):
-        return tclass_name in cls.__register
+    def defines(self, tclass_name):
+        return tclass_name in self.__register
     
-    @classmethod
-    def matches(cls, tclass_string):
+    def matches(self, tclass_string):
         tclass_name, *type_args = tclass_string.split(InterpreterBase.TYPE_CONCAT_CHAR)
-        return cls.defines(tclass_name) and cls.get_num_args(tclass_name).unwrap() == len(type_args)
+        return self.defines(tclass_name) and self.get_num_args(tclass_name).unwrap() == len(type_args)
 
-    @classmethod
-    def get_num_args(cls, tclass_name):
-        if not cls.defines(tclass_name):
+    def get_num_args(self, tclass_name):
+        if not self.defines(tclass_name):
             return Result.Err(ErrorType.TYPE_ERROR, f"No templated class named {tclass_name} found")
         
-        return Result.Ok(cls.__register[tclass_name])
+        return Result.Ok(self.__register[tclass_name])
     
-    @classmethod
-    def register(cls, tclass_name, num_args):
-        if cls.defines(tclass_name):
+    def register(self, tclass_name, num_args):
+        if self.defines(tclass_name):
             return Result.Err(ErrorType.TYPE_ERROR, f"Attempted duplicate definition of templated type {tclass_name}")
         
-        cls.__register[tclass_name] = num_args
+        self.__register[tclass_name] = num_args
         return Result.Ok()
     
-    @classmethod
-    def entries(cls):
-        return set(cls.__register.keys())
+    def entries(self):
+        return set(self.__register.keys())
     
-    @classmethod
-    def clear(cls):
-        cls.__register = {}
+    def clear(self):
+        self.__register = {}
         return Result.Ok()
 
 
-def str_to_type(string):
+def str_to_type(string, interpreter_ref):
+    # types are looked up in the type registries of interpreter_ref
+    type_registry = interpreter_ref.type_registry
+    tclass_registry = interpreter_ref.tclass_registry
     match string:
         case InterpreterBase.INT_DEF:
             out = Type.INT
@@ -152,12 +147,12 @@ def str_to_type(string):
             out = Type.NULL
         case InterpreterBase.VOID_DEF:
             out = Type.NOTHING
-        case string if TypeRegistry.defines(string):
+        case string if type_registry.defines(string):
             out = string
-        case string if TClassRegistry.defines(string.split(InterpreterBase.TYPE_CONCAT_CHAR)[0]):
+        case string if tclass_registry.defines(string.split(InterpreterBase.TYPE_CONCAT_CHAR)[0]):
             name, *type_args = string.split(InterpreterBase.TYPE_CONCAT_CHAR)
             # definition checking is already done
-            exp_num_args = TClassRegistry.get_num_args(name).unwrap()
+            exp_num_args = tclass_registry.get_num_args(name).unwrap()
 
             if len(type_args) != exp_num_args:
                 return Result.Err(
@@ -168,7 +163,7 @@ def str_to_type(string):
             # NOTE: with recursion, this currently allows nesting of templated types, i.e.
             # bruh@bruh@int is valid, returning a bruh with a type arg of (bruh@int)
             # possibly problematic
-            type_args_as_types = map(str_to_type, type_args)
+            type_args_as_types = (str_to_type(type_arg, interpreter_ref) for type_arg in type_args)
             for type_arg_res in type_args_as_types:
                 if not type_arg_res.ok:
                     return type_arg_res
@@ -181,7 +176,7 @@ def str_to_type(string):
     return Result.Ok(out)
 
 
-def is_subclass_of(typ1, typ2):
+def is_subclass_of(typ1, typ2, interpreter_ref):
     # check if typ1 is a (non-strict) subclass of typ2
     if typ1 == typ2:
         return True
@@ -190,11 +185,11 @@ def is_subclass_of(typ1, typ2):
     if typ1 == Type.NULL and (typ2 == Type.CLASS or not isinstance(typ2, Type)):
         return True
     
-    elif not isinstance(typ1, Type) and TClassRegistry.matches(typ1):
+    elif not isinstance(typ1, Type) and interpreter_ref.tclass_registry.matches(typ1):
         # no inheritance with templated classes
         supers_of_typ1 = {Type.CLASS}
     else:
-        supers_of_typ1_res = TypeRegistry.get_all_supers(typ1)
+        supers_of_typ1_res = interpreter_ref.type_registry.get_all_supers(typ1)
         if not supers_of_typ1_res.ok:
             return False
         supers_of_typ1 = supers_of_typ1_res.unwrap()
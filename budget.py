@@ -0,0 +1,64 @@
+from enum import Enum
+from math import inf
+
+
+class BudgetErrorType(Enum):
+    """
+    Errors for running past a limit of an ExecutionBudget; kept apart from ErrorType
+    so that running out of budget can't be mistaken for an error in the program
+    """
+    STEP_LIMIT_ERROR = 1
+    CALL_LIMIT_ERROR = 2
+    DEPTH_LIMIT_ERROR = 3
+    ALLOCATION_LIMIT_ERROR = 4
+
+
+class ExecutionBudget:
+    """
+    Counts the statements executed, method calls made, call depth and objects allocated
+    in a run (an object and its base class parts count as one), and aborts the run through InterpreterBase.error once any of them passes
+    its limit. A limit of None means no limit
+    The counters are updated directly by Object and Interpreter, so counting stays a
+    couple of attribute updates and a comparison
+    """
+    def __init__(self, max_steps=None, max_calls=None, max_depth=None, max_objects=None):
+        self.max_steps = inf if max_steps is None else max_steps
+        self.max_calls = inf if max_calls is None else max_calls
+        self.max_depth = inf if max_depth is None else max_depth
+        self.max_objects = inf if max_objects is None else max_objects
+        self.reset()
+
+    def reset(self):
+        self.steps = 0
+        self.calls = 0
+        self.depth = 0
+        self.deepest = 0
+        self.objects = 0
+
+    def usage(self):
+        return {
+            "statements": self.steps,
+            "calls": self.calls,
+            "max_depth": self.deepest,
+            "objects": self.objects,
+        }
+
+    def exceed_steps(self, interpreter, line_num):
+        interpreter.error(
+            BudgetErrorType.STEP_LIMIT_ERROR, f"Exceeded the limit of {self.max_steps} statements", line_num
+        )
+
+    def exceed_calls(self, interpreter, line_num):
+        interpreter.error(
+            BudgetErrorType.CALL_LIMIT_ERROR, f"Exceeded the limit of {self.max_calls} method calls", line_num
+        )
+
+    def exceed_depth(self, interpreter, line_num):
+        interpreter.error(
+            BudgetErrorType.DEPTH_LIMIT_ERROR, f"Exceeded the limit of {self.max_depth} nested method calls", line_num
+        )
+
+    def exceed_objects(self, interpreter, line_num):
+        interpreter.error(
+            BudgetErrorType.ALLOCATION_LIMIT_ERROR, f"Exceeded the limit of {self.max_objects} objects", line_num
+        )
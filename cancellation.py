@@ -0,0 +1,24 @@
+from enum import Enum
+
+
+class CancellationErrorType(Enum):
+    """
+    Error for a run that was stopped from outside, e.g. by a timeout
+    """
+    CANCELLED_ERROR = 1
+
+
+class CancellationToken:
+    """
+    Flag that another thread sets to stop a running interpreter. The interpreter
+    checks it on every method call and every iteration of a while loop, and aborts
+    through InterpreterBase.error once it is set
+    """
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def abort(self, interpreter, line_num=None):
+        interpreter.error(CancellationErrorType.CANCELLED_ERROR, "Execution was cancelled", line_num)
@@ -1,4 +1,4 @@
-from btypes import Type, TypeRegistry
+from btypes import Type
 from value import get_default_value_as_brewin_literal
 from intbase import InterpreterBase, ErrorType
 from bparser import StringWithLineNumber
@@ -9,11 +9,13 @@ class FieldDef:
     Type checking is performed in the Field class, which is used by Object
     These FieldDefs are translated into Fields on instantiation of a class
     """
-    def __init__(self, typ, name, value=None):
+    def __init__(self, typ, name, value=None, interpreter_ref=None):
         # ex: (field int nah 4)
+        # without a value, the default value of typ is looked up with interpreter_ref
         self.type = typ
         self.name = name
-        self.value = value if value is not None else StringWithLineNumber(get_default_value_as_brewin_literal(self.type), typ.line_num)
+        self.value = value if value is not None else \
+            StringWithLineNumber(get_default_value_as_brewin_literal(self.type, interpreter_ref), typ.line_num)
 
 
 class MethodDef:
@@ -21,12 +23,14 @@ class MethodDef:
     Stores code definition of a method to run. 
     Type checking is performed in the Object class, which handles execution
     """
-    def __init__(self, return_type, name, formal_params, statement):
+    def __init__(self, return_type, name, formal_params, statement, native=None):
         # ex: (method void main () (blah))
         self.return_type = return_type
         self.name = name
         self.formal_params = formal_params
         self.statement = statement
+        # for built-in methods, a Python function to run instead of statement
+        self.native = native
 
 
 class ClassDef:
@@ -38,11 +42,11 @@ class ClassDef:
         self.class_def = class_def
         self.name = class_def[1]
         
-        if class_def[2] == InterpreterBase.INHERITS_DEF:
-            res = TypeRegistry.register(self.name, class_def[3])
+        if len(class_def) > 2 and class_def[2] == InterpreterBase.INHERITS_DEF:
+            res = interpreter_ref.type_registry.register(self.name, class_def[3])
             body_starts_at = 4
         else:
-            res = TypeRegistry.register(self.name, Type.CLASS)
+            res = interpreter_ref.type_registry.register(self.name, Type.CLASS)
             body_starts_at = 2
         
         if not res.ok:
@@ -59,6 +63,10 @@ class ClassDef:
 
     def get_method_defs(self):
         return self.__method_defs
+
+    def create_native_state(self):
+        # storage for built-in classes implemented in Python; user classes have none
+        return None
     
     def extract_field_and_method_defs(self):
         for member in self.class_body:
@@ -71,7 +79,7 @@ class ClassDef:
                         field_name.line_num
                     )
                 
-                self.__field_defs[field_name] = FieldDef(*member[1:])
+                self.__field_defs[field_name] = FieldDef(*member[1:], interpreter_ref=self.interpreter_ref)
 
             elif member[0] == InterpreterBase.METHOD_DEF:
                 method_name = member[2]
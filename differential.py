@@ -0,0 +1,179 @@
+"""
+Differential testing of two interpreter configurations: runs every program in the
+test directories (and any generated corpora) under both, and reports the programs
+whose output, error type or error line differ, and how their speeds compare.
+
+    python3 differential.py --a default --b instrumented
+    python3 differential.py --b-engine my_faster_interpreter --corpus path/to/generated
+"""
+
+import importlib
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser
+from glob import glob
+from os.path import exists, splitext
+
+from cancellation import CancellationToken
+
+TEST_DIRECTORIES = {
+    "2": ["v2/tests", "v2/fails"],
+    "3": ["v3/tests", "v3/fails"],
+}
+
+# name -> Interpreter keyword arguments for Brewin# programs; Brewin++ programs are
+# always run with the defaults, as interpreterv2 takes none of these
+CONFIGURATIONS = {
+    "default": {},
+    "instrumented": {"profile": True, "trace_output": True, "coverage": True, "track_heap": True},
+    "ring_output": {"output_log_size": 1 << 20},
+}
+
+
+class Configuration:
+    """
+    How to run a program: the interpreter modules for each version and the keyword
+    arguments for Brewin# interpreters
+    """
+    def __init__(self, name, options=None, engine=None):
+        self.name = name
+        self.options = options if options is not None else CONFIGURATIONS[name]
+        self.engines = {
+            "2": importlib.import_module("interpreterv2"),
+            "3": importlib.import_module(engine or "interpreterv3"),
+        }
+
+    def run(self, version, program, inp, timeout):
+        """Output, (error type, error line) and seconds taken by a run of program"""
+        cancel_token = CancellationToken()
+        options = self.options if version == "3" else {}
+        interpreter = self.engines[version].Interpreter(False, list(inp), cancel_token=cancel_token, **options)
+
+        # a program that never finishes is stopped, and reported as an error
+        timer = threading.Timer(timeout, cancel_token.cancel)
+        timer.start()
+        start = time.perf_counter()
+        try:
+            interpreter.run(program)
+            error = (None, None)
+        except Exception as exception:  # pylint: disable=broad-except
+            # a RecursionError is a RuntimeError too, but has no error type of the interpreter's
+            error_type, error_line = interpreter.get_error_type_and_line()
+            error = (str(error_type), error_line) if error_type is not None else (type(exception).__name__, None)
+        finally:
+            elapsed = time.perf_counter() - start
+            timer.cancel()
+
+        return list(interpreter.get_output()), error, elapsed
+
+
+def find_programs(version, corpora):
+    """(version, path) of every program in the test directories of version, and in corpora"""
+    programs = []
+    for directory in TEST_DIRECTORIES[version]:
+        programs += [(version, path) for path in sorted(glob(f"{directory}/*.brewin"))]
+    for directory in corpora:
+        programs += [("3", path) for path in sorted(glob(f"{directory}/*.brewin"))]
+    return programs
+
+
+def compare(configuration_a, configuration_b, programs, timeout=10):
+    """The divergences between the two configurations over programs, and the run times"""
+    divergences = []
+    timings = []
+    for version, path in programs:
+        with open(path, encoding="utf-8") as handle:
+            program = handle.readlines()
+        inp = []
+        if exists(splitext(path)[0] + ".in"):
+            with open(splitext(path)[0] + ".in", encoding="utf-8") as handle:
+                inp = [line.rstrip("\n") for line in handle]
+
+        output_a, error_a, time_a = configuration_a.run(version, program, inp, timeout)
+        output_b, error_b, time_b = configuration_b.run(version, program, inp, timeout)
+        timings.append({"program": path, "a": time_a, "b": time_b})
+
+        differences = []
+        if output_a != output_b:
+            differences.append("output")
+        if error_a[0] != error_b[0]:
+            differences.append("error type")
+        elif error_a[1] != error_b[1]:
+            differences.append("error line")
+        if differences:
+            divergences.append({
+                "program": path,
+                "differences": differences,
+                "a": {"output": output_a, "error": error_a},
+                "b": {"output": output_b, "error": error_b},
+            })
+
+    return divergences, timings
+
+
+def report(configuration_a, configuration_b, divergences, timings):
+    """Lines describing each divergence, then the relative speed of the two configurations"""
+    lines = []
+    for divergence in divergences:
+        lines.append(f"DIVERGED {divergence['program']}: {', '.join(divergence['differences'])}")
+        for side, name in (("a", configuration_a.name), ("b", configuration_b.name)):
+            result = divergence[side]
+            lines.append(f"  {name}: error {result['error'][0]} on line {result['error'][1]}, "
+                         f"output {result['output'][-5:]}")
+
+    total_a = sum(timing["a"] for timing in timings)
+    total_b = sum(timing["b"] for timing in timings)
+    ratios = [timing["b"] / timing["a"] for timing in timings if timing["a"] > 0]
+    lines += [
+        f"{len(timings) - len(divergences)}/{len(timings)} programs behaved the same",
+        f"total time: {configuration_a.name} {total_a:.3f}s, {configuration_b.name} {total_b:.3f}s",
+    ]
+    if ratios:
+        lines.append(f"median time of {configuration_b.name} relative to {configuration_a.name}: "
+                     f"{statistics.median(ratios):.3f}x")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Run programs under two interpreter configurations and compare them")
+    for side, default in (("a", "default"), ("b", "instrumented")):
+        parser.add_argument(f"--{side}", default=default, help=f"configuration {side}: one of {list(CONFIGURATIONS)}, or any name with --{side}-options")
+        parser.add_argument(f"--{side}-engine", help=f"module providing the Brewin# Interpreter of configuration {side}")
+        parser.add_argument(f"--{side}-options", type=json.loads,
+                            help=f"Interpreter keyword arguments for configuration {side}, as JSON")
+    parser.add_argument("--versions", nargs="+", choices=list(TEST_DIRECTORIES), default=list(TEST_DIRECTORIES))
+    parser.add_argument("--corpus", action="append", default=[], help="directory of more Brewin# programs")
+    parser.add_argument("--generate", type=int, default=0, help="also generate this many programs to compare")
+    parser.add_argument("--timeout", type=float, default=10, help="seconds before a run is stopped")
+    parser.add_argument("--json", help="write the divergences and timings to this file")
+    args = parser.parse_args()
+    for side in ("a", "b"):
+        # a configuration of another name has to be given its options
+        if getattr(args, side) not in CONFIGURATIONS and getattr(args, f"{side}_options") is None:
+            parser.error(f"--{side}: unknown configuration {getattr(args, side)}; choose one of "
+                         f"{list(CONFIGURATIONS)} or give --{side}-options")
+
+    configuration_a = Configuration(args.a, args.a_options, args.a_engine)
+    configuration_b = Configuration(args.b, args.b_options, args.b_engine)
+
+    with tempfile.TemporaryDirectory() as generated:
+        corpora = list(args.corpus)
+        if args.generate:
+            from benchmarks.generator import write_corpus, DIMENSIONS
+            write_corpus(generated, args.generate, randomize=True, **DIMENSIONS)
+            corpora.append(generated)
+
+        programs = []
+        for program_version in args.versions:
+            programs += find_programs(program_version, corpora if program_version == "3" else [])
+        found_divergences, found_timings = compare(configuration_a, configuration_b, programs, args.timeout)
+
+    print("\n".join(report(configuration_a, configuration_b, found_divergences, found_timings)))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"divergences": found_divergences, "timings": found_timings}, f, indent=4)
+    sys.exit(1 if found_divergences else 0)
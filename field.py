@@ -1,24 +1,34 @@
+import copy
 from value import create_value, get_default_value
 from result import Result
 from btypes import str_to_type, is_subclass_of
 from intbase import ErrorType
 
 class Field:
-    def __init__(self, typ, name="field", value=None):
+    def __init__(self, typ, interpreter_ref, name="field", value=None):
         # indicates whether any error has occurred with this field
         self.status = Result.Ok()
         self.type = typ
+        # types are checked against the type registries of interpreter_ref
+        self.interpreter_ref = interpreter_ref
         self.name = name
         self.value = value
 
         if value is None:
-            self.value = get_default_value(self.type)
+            self.value = get_default_value(self.type, interpreter_ref)
+
+    def __deepcopy__(self, memo):
+        # copies share the interpreter_ref, rather than copying the whole interpreter
+        instance = copy.copy(self)
+        instance.status = copy.deepcopy(self.status, memo)
+        instance.value = copy.deepcopy(self.value, memo)
+        return instance
 
     def __set_to_field_def(self, field_type, field_value):
         if not self.status.ok:
             return
 
-        type_res = str_to_type(field_type)
+        type_res = str_to_type(field_type, self.interpreter_ref)
         if not type_res.ok:
             self.status = type_res
             self.status.line_num = getattr(field_type, "line_num", None)
@@ -33,7 +43,7 @@ class Field:
         desired_type = type_res.unwrap()
         desired_value = value_res.unwrap()
 
-        if not is_subclass_of(desired_value.type, desired_type):
+        if not is_subclass_of(desired_value.type, desired_type, self.interpreter_ref):
             self.status = Result.Err(
                 ErrorType.TYPE_ERROR,
                 f"Type mismatch in definition of field {self.name}: {field_value} is not of type {field_type}",
@@ -52,7 +62,7 @@ class Field:
         if not self.status.ok:
             return
         # set this field to hold value, assuming value is a Value
-        if not is_subclass_of(other.type, self.type):
+        if not is_subclass_of(other.type, self.type, self.interpreter_ref):
             self.status = Result.Err(
                 ErrorType.TYPE_ERROR,
                 f"Type mismatch while setting {self.name}: {other.type} is not of type {self.type}"
@@ -66,7 +76,7 @@ class Field:
         if not self.status.ok:
             return
         # set this field to hold value, assuming value is a Value
-        if not is_subclass_of(value.type, self.type):
+        if not is_subclass_of(value.type, self.type, self.interpreter_ref):
             self.status = Result.Err(
                 ErrorType.TYPE_ERROR,
                 f"Type mismatch while setting {self.name}: {value} is not of type {self.type}"
@@ -78,20 +88,20 @@ class Field:
     
     def can_be_set_to(self, typ):
         # whether or not this field can be set to a Value of type typ
-        return is_subclass_of(typ, self.type)
+        return is_subclass_of(typ, self.type, self.interpreter_ref)
     
     @classmethod
-    def from_field_def(cls, field_def):
-        instance = cls(field_def.type, field_def.name, field_def.value)
+    def from_field_def(cls, field_def, interpreter_ref):
+        instance = cls(field_def.type, interpreter_ref, field_def.name, field_def.value)
         instance.status = Result.Ok()
         # defines self.value and self.type
         instance.__set_to_field_def(field_def.type, field_def.value)
         return instance
     
     @classmethod
-    def from_value(cls, value, name="field"):
+    def from_value(cls, value, interpreter_ref, name="field"):
         typ = value.type
-        return cls(typ, name, value)
+        return cls(typ, interpreter_ref, name, value)
 
 
 
@@ -4,11 +4,22 @@ test management.
 """
 
 import asyncio
+import hashlib
+import io
 import json
-from os import makedirs
+import multiprocessing
+import time
+from contextlib import redirect_stdout
+from multiprocessing.connection import wait
+from os import cpu_count, makedirs
 from os.path import exists
 from abc import ABC, abstractmethod
 
+from cancellation import CancellationToken
+
+# how long a timed out test gets to notice its cancellation before it is abandoned
+CANCEL_GRACE_PERIOD = 1
+
 
 class AbstractTestScaffold(ABC):
     """ABC for test scaffold"""
@@ -22,9 +33,62 @@ class AbstractTestScaffold(ABC):
         """Run the test case end-to-end; return a number encoding the points allocated."""
 
 
-def run_test(scaffold, test_case):
-    """Ran a single test case with the scaffold; returns score."""
+class ResultCache:
+    """
+    Scores of test cases from earlier runs, stored as JSON at path. A score is reused
+    only while the test's source, input and expected output files and salt (a hash of
+    everything else the result depends on, like the interpreter's source) are unchanged.
+    """
+
+    def __init__(self, path, salt=""):
+        self.path = path
+        self.salt = salt
+        self.scores = {}
+        if exists(path):
+            with open(path, encoding="utf-8") as handle:
+                self.scores = json.load(handle)
+
+    def key(self, test_case):
+        """Hash of everything the test case's result depends on."""
+        digest = hashlib.sha256(self.salt.encode("utf-8"))
+        digest.update(str(test_case.get("expect_failure", False)).encode("utf-8"))
+        for file_key in ("srcfile", "inputfile", "expfile"):
+            path = test_case.get(file_key)
+            # a missing file (usually the input) hashes differently from an empty one
+            digest.update(hash_file(path).encode("utf-8") if path and exists(path) else b"-")
+        return digest.hexdigest()
+
+    def get(self, test_case):
+        """The cached score of the test case, or None."""
+        return self.scores.get(test_case["srcfile"], {}).get(self.key(test_case))
+
+    def put(self, test_case, score):
+        # by source file, as tests of different versions can share a name
+        self.scores[test_case["srcfile"]] = {self.key(test_case): score}
+
+    def forget(self, test_case):
+        """Drop the cached score of the test case, so that it is rerun."""
+        self.scores.pop(test_case["srcfile"], None)
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as handle:
+            json.dump(self.scores, handle, indent=4)
+
+
+def hash_file(path):
+    """SHA-256 of the file at path."""
+    with open(path, "rb") as handle:
+        return hashlib.sha256(handle.read()).hexdigest()
+
+
+def run_test(scaffold, test_case, cancel_token=None):
+    """
+    Ran a single test case with the scaffold; returns score.
+    The scaffold finds cancel_token in the environment, and should stop the test
+    once it is cancelled.
+    """
     environment = scaffold.setup(test_case)
+    environment["cancel_token"] = cancel_token
     try:
         return scaffold.run_test_case(test_case, environment)
     except Exception as exception:  # pylint: disable=broad-except
@@ -36,39 +100,140 @@ async def run_test_wrapper(interpreter, test_case, timeout):
     """
     Wrapper for run_test with timeout and minor debugging.
     Uses asyncio to enforce timeout, not for concurrency.
+    Returns None if the test timed out.
     """
     print(f'Running {test_case["srcfile"]}... ', end="")
+    cancel_token = CancellationToken()
+    test = asyncio.ensure_future(
+        asyncio.to_thread(run_test, interpreter, test_case, cancel_token)
+    )
     try:
         async with asyncio.timeout(timeout):
-            result = await asyncio.to_thread(run_test, interpreter, test_case)
+            # shielded, so the timeout leaves the test running until it is cancelled
+            result = await asyncio.shield(test)
             print(f' {"PASSED" if result else "FAILED"}')
             return result
     except asyncio.TimeoutError:
+        # stop the test's thread rather than leaving it running alongside the next test
+        cancel_token.cancel()
+        await asyncio.wait([test], timeout=CANCEL_GRACE_PERIOD)
         print("TIMED OUT")
-        return 0
+        return None
 
 
-async def run_all_tests(interpreter, tests, timeout_per_test=5):
+async def run_all_tests(interpreter, tests, timeout_per_test=5, cache=None):
     """
     Run all tests sequentially; defaults to 5s timeout per test.
     Each test case *must* have a name and srcfile key.
+    With a ResultCache, tests whose results are cached are not rerun.
     """
     print(f"Running {len(tests)} tests...")
-    results = [
-        {
-            "name": test["name"],
-            "score": await run_test_wrapper(interpreter, test, timeout_per_test),
-            "max_score": 1,
-            "visibility": "visible"
-            if test.get("visible", False)
-            else "after_published",
-        }
-        for test in tests
-    ]
+    results = []
+    for test in tests:
+        score = cache.get(test) if cache is not None else None
+        if score is not None:
+            print(f'Running {test["srcfile"]}...  {"PASSED" if score else "FAILED"} (cached)')
+        else:
+            score = await run_test_wrapper(interpreter, test, timeout_per_test)
+            if score is None:
+                # timeouts can come from the machine being busy, so they are not cached
+                score = 0
+            elif cache is not None:
+                cache.put(test, score)
+        results.append(format_result(test, score))
     print(f"{get_score(results)}/{len(tests)} tests passed.")
     return results
 
 
+def run_test_in_process(scaffold, test_case, connection):
+    """Run a single test case in a worker process, sending back its score and anything it printed."""
+    log = io.StringIO()
+    with redirect_stdout(log):
+        result = run_test(scaffold, test_case)
+    connection.send((result, log.getvalue()))
+    connection.close()
+
+
+def run_all_tests_parallel(scaffold, tests, timeout_per_test=5, workers=None, cache=None):
+    """
+    Run all tests in up to workers processes at once (by default, one per core).
+    Each test gets a forked process of its own, which is killed if it times out.
+    Tests are reported in order, and the results are the same as run_all_tests'.
+    """
+    context = multiprocessing.get_context("fork")
+    workers = workers or cpu_count() or 1
+    print(f"Running {len(tests)} tests...")
+
+    scores = [cache.get(test) if cache is not None else None for test in tests]
+    cached = {index for index, score in enumerate(scores) if score is not None}
+    pending = [(index, test) for index, test in enumerate(tests) if index not in cached]
+    # connection -> (test index, process, deadline)
+    running = {}
+    logs = [""] * len(tests)
+    timed_out = set()
+    reported = 0
+
+    while reported < len(tests):
+        while pending and len(running) < workers:
+            index, test = pending.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=run_test_in_process, args=(scaffold, test, sender), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (index, process, time.monotonic() + timeout_per_test)
+
+        next_deadline = min((deadline for _, _, deadline in running.values()), default=time.monotonic())
+        for receiver in wait(list(running), timeout=max(next_deadline - time.monotonic(), 0)):
+            index, process, _ = running.pop(receiver)
+            try:
+                scores[index], logs[index] = receiver.recv()
+                if cache is not None:
+                    cache.put(tests[index], scores[index])
+            except EOFError:
+                # the worker died without reporting, e.g. killed for running out of memory;
+                # like a timeout, that can come from the machine rather than the test, so it isn't cached
+                scores[index] = 0
+            receiver.close()
+            process.join()
+
+        now = time.monotonic()
+        for receiver, (index, process, deadline) in list(running.items()):
+            if now >= deadline:
+                process.kill()
+                process.join()
+                receiver.close()
+                del running[receiver]
+                scores[index] = 0
+                timed_out.add(index)
+
+        # report finished tests, in order
+        while reported < len(tests) and scores[reported] is not None:
+            print(f'Running {tests[reported]["srcfile"]}... {logs[reported]}', end="")
+            if reported in timed_out:
+                print("TIMED OUT")
+            elif reported in cached:
+                print(f' {"PASSED" if scores[reported] else "FAILED"} (cached)')
+            else:
+                print(f' {"PASSED" if scores[reported] else "FAILED"}')
+            reported += 1
+
+    results = [format_result(test, score) for test, score in zip(tests, scores)]
+    print(f"{get_score(results)}/{len(tests)} tests passed.")
+    return results
+
+
+def format_result(test, score):
+    """Gradescope entry for a test case and its score."""
+    return {
+        "name": test["name"],
+        "score": score,
+        "max_score": 1,
+        "visibility": "visible"
+        if test.get("visible", False)
+        else "after_published",
+    }
+
+
 def format_gradescope_output(results):
     """Generate proper JSON object depending on results type."""
     if isinstance(results, (int, float)):
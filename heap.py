@@ -0,0 +1,145 @@
+import sys
+import weakref
+from collections import Counter
+from brewin_object import Object
+
+
+class HeapTracker:
+    """
+    Tracks the Objects created through Interpreter.instantiate_class: how many of each
+    class (including template instantiations like node@int) were created, how many are
+    still alive and the most that were ever alive at once, and an estimate of how many
+    bytes each takes up. Instantiating a derived class also instantiates an Object for
+    each of its base classes; these are counted as base parts rather than instances,
+    and are included in the size of the derived object
+    """
+    def __init__(self):
+        self.created = Counter()
+        self.live = Counter()
+        self.peak_live = Counter()
+        self.base_parts = Counter()
+        # class name -> estimated bytes of its first instance, including base parts
+        self.bytes_per_object = {}
+        self.__refs = set()
+
+    def record(self, obj, as_base_part=False):
+        name = obj.name
+        if name not in self.bytes_per_object:
+            self.bytes_per_object[name] = estimate_size(obj)
+
+        if as_base_part:
+            self.base_parts[name] += 1
+            return
+
+        self.created[name] += 1
+        self.live[name] += 1
+        if self.live[name] > self.peak_live[name]:
+            self.peak_live[name] = self.live[name]
+
+        # the weak reference has to outlive obj for its callback to run
+        self.__refs.add(weakref.ref(obj, lambda ref: self.__collected(ref, name)))
+
+    def report(self, root=None):
+        """
+        Lines of a table of per-class statistics; if root is given, also counts the
+        objects reachable from it by class
+        """
+        reachable = Counter(node["class"] for node in self.snapshot(root)["objects"]) if root is not None else None
+
+        header = f"{'class':<24} {'created':>9} {'live':>7} {'peak':>7} {'bytes/obj':>10} {'peak bytes':>11}"
+        if reachable is not None:
+            header += f" {'reachable':>10}"
+        lines = [header]
+
+        for name in sorted(self.created, key=lambda name: -self.peak_live[name] * self.bytes_per_object[name]):
+            line = (
+                f"{name:<24} {self.created[name]:>9} {self.live[name]:>7} {self.peak_live[name]:>7} "
+                f"{self.bytes_per_object[name]:>10} {self.peak_live[name] * self.bytes_per_object[name]:>11}"
+            )
+            if reachable is not None:
+                line += f" {reachable[name]:>10}"
+            lines.append(line)
+
+        return lines
+
+    def snapshot(self, root):
+        """
+        The graph of Objects reachable from root through fields and built-in collections,
+        as a dict of objects (id, class, and fields holding primitives or object ids)
+        """
+        objects = []
+        seen = {id(root)}
+        pending = [root]
+        while pending:
+            obj = pending.pop()
+            fields = {}
+            for field_name, field in obj.get_fields().items():
+                referent = field.value.value
+                if isinstance(referent, Object):
+                    fields[field_name] = {"object": id(referent)}
+                    if id(referent) not in seen:
+                        seen.add(id(referent))
+                        pending.append(referent)
+                else:
+                    fields[field_name] = str(referent) if referent is not None else None
+
+            elements = []
+            for referent in _native_referents(obj):
+                elements.append(id(referent))
+                if id(referent) not in seen:
+                    seen.add(id(referent))
+                    pending.append(referent)
+
+            node = {"id": id(obj), "class": obj.name, "fields": fields}
+            if elements:
+                node["elements"] = elements
+            if obj.get_super() is not None:
+                node["super"] = obj.get_super().name
+            objects.append(node)
+
+        return {"root": id(root), "objects": objects}
+
+    def __collected(self, ref, name):
+        self.__refs.discard(ref)
+        self.live[name] -= 1
+
+
+def _native_referents(obj):
+    # Objects held by a built-in collection
+    state = obj.native_state
+    if isinstance(state, dict):
+        state = state.values()
+    elif not isinstance(state, list):
+        return []
+    return [element for element in state if isinstance(element, Object)]
+
+
+def estimate_size(obj):
+    """
+    Estimated bytes taken up by obj: the Object, its fields and their values, its
+    methods, any built-in storage, and the same for each of its base class parts
+    """
+    total = 0
+    while obj is not None:
+        total += sys.getsizeof(obj) + sys.getsizeof(obj.__dict__)
+
+        fields = obj.get_fields()
+        total += sys.getsizeof(fields)
+        for field in fields.values():
+            total += sys.getsizeof(field) + sys.getsizeof(field.__dict__)
+            total += sys.getsizeof(field.value) + sys.getsizeof(field.value.__dict__)
+            if isinstance(field.value.value, (int, str)):
+                total += sys.getsizeof(field.value.value)
+
+        methods = obj.get_methods()
+        total += sys.getsizeof(methods)
+        for method in methods.values():
+            total += sys.getsizeof(method) + sys.getsizeof(method.__dict__)
+            total += sum(sys.getsizeof(param) for param in method.params_as_fields)
+
+        if obj.native_state is not None:
+            total += sys.getsizeof(obj.native_state)
+
+        obj = obj.get_super()
+
+    return total
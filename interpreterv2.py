@@ -2,7 +2,8 @@ from bparser import BParser
 from intbase import InterpreterBase, ErrorType
 from brewin_object import Object
 from classdef import ClassDef
-from btypes import Type, TypeRegistry
+from cancellation import CancellationToken
+from btypes import Type, TypeRegistry, TClassRegistry
 from value import Value
 
 class Interpreter(InterpreterBase):
@@ -53,14 +54,23 @@ class Interpreter(InterpreterBase):
     binary_op_set = set.union(*[set(ops_for_type.keys()) for ops_for_type in binary_ops.values()])
     unary_op_set = set.union(*[set(ops_for_type.keys()) for ops_for_type in unary_ops.values()])
 
-    def __init__(self, console_output=True, inp=None, trace_output=False):
+    def __init__(self, console_output=True, inp=None, trace_output=False, cancel_token=None):
         super().__init__(console_output, inp)
+        # set from another thread to stop the running program
+        self.cancel_token = cancel_token if cancel_token is not None else CancellationToken()
         self.trace_output = trace_output
         self.main_object = None
         self.__class_definitions = {}
+        # Brewin++ programs are not profiled, budgeted, traced or covered, but Object checks for each
+        self.profiler = None
+        self.budget = None
+        self.tracer = None
+        self.coverage = None
 
-        # reinitialize the TypeRegistry
-        TypeRegistry.clear()
+        # types defined by this interpreter's program, kept apart from any other interpreter's
+        # Brewin++ has no templated classes, but types are looked up in both registries
+        self.type_registry = TypeRegistry()
+        self.tclass_registry = TClassRegistry()
     
     def run(self, program):
         status, parsed_program = BParser.parse(program)
@@ -78,6 +88,9 @@ class Interpreter(InterpreterBase):
         self.main_object = self.instantiate_class(InterpreterBase.MAIN_CLASS_DEF)
         # according to Barista, main doesn't have to have void return type I guess
         self.main_object.execute_method(InterpreterBase.MAIN_FUNC_DEF)
+
+    def get_input_int(self):
+        return int(self.get_input())
         
     def get_class_def(self, class_name):
         if class_name not in self.__class_definitions:
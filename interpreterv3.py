@@ -1,10 +1,25 @@
+from collections import deque
 from bparser import BParser
 from intbase import InterpreterBase, ErrorType
 from brewin_object import Object
 from classdef import ClassDef
 from tclassdef import TClassDef
+from native import NativeClassDef
+from bcollections import ArrayTClassDef, MapTClassDef
+from intrinsics import register_intrinsics
+from reader import InputReader
+from profiler import MethodProfiler
+from sampler import LineSampler
+from heap import HeapTracker
+from budget import ExecutionBudget
+from cancellation import CancellationToken
+from tracer import Tracer
+from brewin_coverage import Coverage
+from timings import PhaseTimer
 from btypes import Type, TypeRegistry, TClassRegistry
 from value import Value
+from rope import concat
+from program import Program
 
 class Interpreter(InterpreterBase):
     # define builtin operations
@@ -23,14 +38,15 @@ class Interpreter(InterpreterBase):
         "<=": lambda a, b: Value(Type.BOOL, a.value <= b.value),
     }
 
+    # string values may be Ropes, so everything other than + flattens with str()
     binary_ops[Type.STRING] = {
-        "+": lambda a, b: Value(Type.STRING, a.value + b.value),
-        "==": lambda a, b: Value(Type.BOOL, a.value == b.value),
-        "!=": lambda a, b: Value(Type.BOOL, a.value != b.value),
-        ">": lambda a, b: Value(Type.BOOL, a.value > b.value),
-        "<": lambda a, b: Value(Type.BOOL, a.value < b.value),
-        ">=": lambda a, b: Value(Type.BOOL, a.value >= b.value),
-        "<=": lambda a, b: Value(Type.BOOL, a.value <= b.value),
+        "+": lambda a, b: Value(Type.STRING, concat(a.value, b.value)),
+        "==": lambda a, b: Value(Type.BOOL, str(a.value) == str(b.value)),
+        "!=": lambda a, b: Value(Type.BOOL, str(a.value) != str(b.value)),
+        ">": lambda a, b: Value(Type.BOOL, str(a.value) > str(b.value)),
+        "<": lambda a, b: Value(Type.BOOL, str(a.value) < str(b.value)),
+        ">=": lambda a, b: Value(Type.BOOL, str(a.value) >= str(b.value)),
+        "<=": lambda a, b: Value(Type.BOOL, str(a.value) <= str(b.value)),
     }
 
     binary_ops[Type.BOOL] = {
@@ -54,42 +70,241 @@ class Interpreter(InterpreterBase):
     binary_op_set = set.union(*[set(ops_for_type.keys()) for ops_for_type in binary_ops.values()])
     unary_op_set = set.union(*[set(ops_for_type.keys()) for ops_for_type in unary_ops.values()])
 
-    def __init__(self, console_output=True, inp=None, trace_output=False):
+    def __init__(self, console_output=True, inp=None, trace_output=False, output_sink=None, output_log_size=None,
+                 profile=False, sample_interval=None, track_heap=False, budget=None, cancel_token=None,
+                 coverage=False):
+        """
+        inp: a list of input lines or an InputReader; if not given, input is read from stdin
+        trace_output: whether to record the run in self.tracer, a Tracer; may also be
+            the Tracer to record into
+        output_sink: an OutputSink that receives printed lines instead of stdout
+        output_log_size: how many printed lines get_output keeps; None keeps all of them,
+            0 keeps none, and n keeps only the last n
+        profile: whether to record per-method timings in self.profiler, a MethodProfiler
+        sample_interval: if given, sample the running line every sample_interval seconds
+            with self.sampler, a LineSampler
+        track_heap: whether to count the objects of each class in self.heap, a HeapTracker
+        budget: an ExecutionBudget limiting the run; without one, usage is still counted
+        cancel_token: a CancellationToken that another thread can use to stop the run
+        coverage: whether to count the statements and branches run in self.coverage, a Coverage
+        """
         super().__init__(console_output, inp)
         self.trace_output = trace_output
+        if isinstance(trace_output, Tracer):
+            self.tracer = trace_output
+        else:
+            self.tracer = Tracer() if trace_output else None
+        self.output_sink = output_sink
+        self.output_log_size = output_log_size
+        self.output_log = self.__create_output_log()
+        self.profiler = MethodProfiler() if profile else None
+        self.sampler = LineSampler(sample_interval) if sample_interval else None
+        self.heap = HeapTracker() if track_heap else None
+        self.budget = budget if budget is not None else ExecutionBudget()
+        self.cancel_token = cancel_token if cancel_token is not None else CancellationToken()
+        self.coverage = Coverage() if coverage else None
+        # what a run of a compiled Program falls back to when not given its own
+        self.__run_defaults = (inp, output_sink, self.cancel_token)
+        # seconds spent in each phase of the last run
+        self.timings = {}
+        self.__phases = PhaseTimer()
+        # how many Objects are part way through being constructed
+        self.__constructing = 0
         self.main_object = None
         self.__class_definitions = {}
         self.__tclass_definitions = {}
 
-        # reinitialize the TypeRegistry
-        TypeRegistry.clear()
-        # reinitialize the TClassRegistry
-        TClassRegistry.clear()
+        # types defined by this interpreter's program, kept apart from any other interpreter's
+        self.type_registry = TypeRegistry()
+        self.tclass_registry = TClassRegistry()
+
+        # built-in templated classes, implemented in Python; like built-in classes, they
+        # are only defined once the program is known not to define classes of the same names
+        self.__native_tclass_definitions = {}
+        for native_tclass in [ArrayTClassDef, MapTClassDef]:
+            native_tclass_def = native_tclass(self)
+            self.__native_tclass_definitions[native_tclass_def.name] = native_tclass_def
+
+        # built-in classes: class name -> {method name: (return type, name, formal params, function)}
+        self.__native_class_methods = {}
+        register_intrinsics(self)
+
+    def register_native_method(self, class_name, return_type, method_name, formal_params, function):
+        """
+        Register a Python function as a method of a built-in class, creating the class
+        if it does not exist yet. The method is declared with its Brewin signature, e.g.
+            register_native_method("strlib", "int", "length", [("string", "s")], length)
+        and is type checked like any Brewin method, but is called directly as
+            function(obj, line_num_of_call, *argument_values)
+        which must return a Value of the declared return type, or None for void
+        The class name may also be a built-in templated class like array, in which case
+        types can refer to its type parameters. Must be called before run
+        A class or templated class of the same name defined by the program replaces
+        the built-in one
+        """
+        method = (return_type, method_name, formal_params, function)
+
+        if class_name in self.__native_tclass_definitions:
+            self.__native_tclass_definitions[class_name].add_method(*method)
+            return
+
+        self.__native_class_methods.setdefault(class_name, {})[method_name] = method
     
     def run(self, program):
+        self.__measure(self.__run, program)
+
+    def compile(self, program):
+        """
+        Parse program and define its classes without running it, returning a Program
+        that can be run any number of times with different input and output
+        Like run, this can only be done once per Interpreter
+        """
+        self.__measure(self.__compile, program)
+        return Program(self, program)
+
+    def run_compiled(self, inp=None, output_sink=None, cancel_token=None):
+        """
+        Run the program compiled by compile again from the start, with inp, output_sink
+        and cancel_token in place of the ones the Interpreter was created with; see Program.run
+        Anything not given is the Interpreter's own, never the last run's
+        """
+        default_inp, default_output_sink, default_cancel_token = self.__run_defaults
+        self.inp = inp if inp is not None else default_inp
+        self.output_sink = output_sink if output_sink is not None else default_output_sink
+        self.cancel_token = cancel_token if cancel_token is not None else default_cancel_token
+        # clears the output log, input cursor and error of the last run
+        self.reset()
+        self.main_object = None
+        self.__measure(self.__execute)
+
+    def __measure(self, step, *args):
+        # budget, timings, sampling, tracing and output flushing around a step of a run
+        self.budget.reset()
+        self.__phases = PhaseTimer()
+        if self.sampler is not None:
+            self.sampler.start()
+
+        try:
+            step(*args)
+        except RuntimeError:
+            if self.tracer is not None and self.error_type is not None:
+                self.tracer.error(self.error_type, self.error_line)
+            raise
+        finally:
+            self.__phases.stop()
+            self.timings = self.__phases.seconds()
+            if self.sampler is not None:
+                self.sampler.stop()
+            # output is flushed even if the program errors out
+            if self.output_sink is not None:
+                self.output_sink.flush()
+
+    def get_usage(self):
+        """Statements executed, method calls, deepest call nesting and Objects allocated by the last run"""
+        return self.budget.usage()
+
+    def reset(self):
+        super().reset()
+        self.output_log = self.__create_output_log()
+
+    def output(self, val):
+        if self.output_sink is not None:
+            self.output_sink.write(val)
+        elif self.console_output:
+            print(val)
+
+        if self.output_log is not None:
+            self.output_log.append(val)
+
+    def get_output(self):
+        if self.output_log is None:
+            return []
+        if isinstance(self.output_log, deque):
+            return list(self.output_log)
+        return self.output_log
+
+    def get_input(self):
+        # inp may also be an InputReader, which reads lines lazily
+        if isinstance(self.inp, InputReader):
+            self.__flush_before_waiting()
+            return self.inp.read_line()
+
+        # show anything printed so far before waiting on stdin
+        if not self.inp and self.output_sink is not None:
+            self.output_sink.flush()
+        return super().get_input()
+
+    def get_input_int(self):
+        if isinstance(self.inp, InputReader):
+            self.__flush_before_waiting()
+            return self.inp.read_int()
+        return int(self.get_input())
+
+    def __flush_before_waiting(self):
+        # whatever is feeding the input may be waiting to see the output first
+        if self.output_sink is not None and not self.inp.ready():
+            self.output_sink.flush()
+
+    def __create_output_log(self):
+        if self.output_log_size is None:
+            return []
+        if self.output_log_size == 0:
+            return None
+        return deque(maxlen=self.output_log_size)
+
+    def __run(self, program):
+        self.__compile(program)
+        self.__execute()
+
+    def __compile(self, program):
+        self.__phases.switch("parse")
         status, parsed_program = BParser.parse(program)
 
         if not status:
             super().error(
                 ErrorType.SYNTAX_ERROR, f"Parse error: {parsed_program}"
             )
+
+        if self.coverage is not None:
+            self.coverage.instrument(parsed_program)
         
+        # names the program defines classes or tclasses with, which built-ins give way to
+        user_defined = {
+            parsed[1] for parsed in parsed_program
+            if len(parsed) > 1 and parsed[0] in (InterpreterBase.CLASS_DEF, InterpreterBase.TEMPLATE_CLASS_DEF)
+        }
+
         # first pass: define all tclasses
+        self.__phases.switch("template_registration")
+        for name, native_tclass_def in self.__native_tclass_definitions.items():
+            if name not in user_defined:
+                native_tclass_def.register()
+                self.__tclass_definitions[name] = native_tclass_def
+
         for parsed_class_or_tclass in parsed_program:
             self.__define_tclass(parsed_class_or_tclass)
         
         # second pass: define all classes
+        self.__phases.switch("class_definition")
+        # built-in classes are defined before any user classes
+        for class_name, methods in self.__native_class_methods.items():
+            if class_name not in user_defined:
+                self.__class_definitions[class_name] = NativeClassDef(class_name, methods.values(), self)
+
         for parsed_class_or_tclass in parsed_program:
             self.__define_class(parsed_class_or_tclass)
         
         # once all classes are defined, extract field and method defs for each class
         for class_def in self.__class_definitions.values():
             class_def.extract_field_and_method_defs()
-        
+
+    def __execute(self):
         # third pass: instantiate and run main
+        self.__phases.switch("main_instantiation")
         self.main_object = self.instantiate_class(InterpreterBase.MAIN_CLASS_DEF)
 
         # according to Barista, main doesn't have to have void return type I guess
+        self.__phases.switch("execution")
         self.main_object.execute_method(InterpreterBase.MAIN_FUNC_DEF)
 
     def get_class_def(self, class_name):
@@ -114,8 +329,12 @@ class Interpreter(InterpreterBase):
             return self.__class_definitions[tclass_string]
         
         tclass_def = self.__tclass_definitions[name]
-        tclass_instance_def = tclass_def.convert_to_class_def(tclass_string)
-        tclass_instance_def.extract_field_and_method_defs()
+        self.__phases.enter("template_concretization")
+        try:
+            tclass_instance_def = tclass_def.convert_to_class_def(tclass_string)
+            tclass_instance_def.extract_field_and_method_defs()
+        finally:
+            self.__phases.exit()
         self.__class_definitions[tclass_string] = tclass_instance_def
         return tclass_instance_def
 
@@ -126,10 +345,26 @@ class Interpreter(InterpreterBase):
         else:
             class_def = self.get_class_def(class_name)
         
-        ret = Object(self, class_def)
+        # base class parts are the only Objects instantiated while constructing another,
+        # and are counted with the object they are part of
+        if self.__constructing == 0:
+            self.budget.objects += 1
+            if self.budget.objects > self.budget.max_objects:
+                self.budget.exceed_objects(self, line_num)
+
+        self.__constructing += 1
+        try:
+            ret = Object(self, class_def)
+        finally:
+            self.__constructing -= 1
+
         if not ret.status.ok:
             ret.status.line_num = line_num
             super().error(*ret.status[1:])
+
+        # only Objects that were constructed successfully are counted
+        if self.heap is not None:
+            self.heap.record(ret, as_base_part=self.__constructing > 0)
         
         return ret
 
@@ -0,0 +1,92 @@
+import math
+from intbase import ErrorType
+from btypes import Type
+from value import Value
+
+STRING_LIBRARY_DEF = "strlib"
+MATH_LIBRARY_DEF = "mathlib"
+
+
+def __fault(obj, message, line_num):
+    obj.interpreter_ref.error(ErrorType.FAULT_ERROR, message, line_num)
+
+
+def str_length(obj, line_num, s):
+    return Value(Type.INT, len(s.value))
+
+
+def str_substring(obj, line_num, s, start, end):
+    # characters start (inclusive) to end (exclusive)
+    s = str(s.value)
+    if not 0 <= start.value <= end.value <= len(s):
+        __fault(obj, f"Invalid substring bounds {start.value} to {end.value} for string of length {len(s)}", line_num)
+    return Value(Type.STRING, s[start.value:end.value])
+
+
+def str_find(obj, line_num, s, sub):
+    # index of the first occurrence of sub in s, or -1
+    return Value(Type.INT, str(s.value).find(str(sub.value)))
+
+
+def str_to_int(obj, line_num, s):
+    s = str(s.value)
+    # isnumeric also lets through things like "--5" and "²", which int rejects
+    try:
+        if not s.lstrip("-").isnumeric():
+            raise ValueError(s)
+        value = int(s)
+    except ValueError:
+        __fault(obj, f"Cannot convert {s} to an int", line_num)
+    return Value(Type.INT, value)
+
+
+def str_from_int(obj, line_num, i):
+    return Value(Type.STRING, str(i.value))
+
+
+def math_abs(obj, line_num, x):
+    return Value(Type.INT, abs(x.value))
+
+
+def math_min(obj, line_num, a, b):
+    return Value(Type.INT, min(a.value, b.value))
+
+
+def math_max(obj, line_num, a, b):
+    return Value(Type.INT, max(a.value, b.value))
+
+
+def math_pow(obj, line_num, base, exponent):
+    if exponent.value < 0:
+        __fault(obj, f"Negative exponent {exponent.value}", line_num)
+    return Value(Type.INT, base.value ** exponent.value)
+
+
+def math_sqrt(obj, line_num, x):
+    # integer square root, rounded down
+    if x.value < 0:
+        __fault(obj, f"Square root of negative number {x.value}", line_num)
+    return Value(Type.INT, math.isqrt(x.value))
+
+
+def register_intrinsics(interpreter):
+    """
+    Register the built-in strlib and mathlib classes on interpreter
+    """
+    for method in [
+        ("int", "length", [("string", "s")], str_length),
+        ("string", "substring", [("string", "s"), ("int", "start"), ("int", "end")], str_substring),
+        ("int", "find", [("string", "s"), ("string", "sub")], str_find),
+        ("int", "to_int", [("string", "s")], str_to_int),
+        ("string", "from_int", [("int", "i")], str_from_int),
+    ]:
+        interpreter.register_native_method(STRING_LIBRARY_DEF, *method)
+
+    for method in [
+        ("int", "abs", [("int", "x")], math_abs),
+        ("int", "min", [("int", "a"), ("int", "b")], math_min),
+        ("int", "max", [("int", "a"), ("int", "b")], math_max),
+        ("int", "pow", [("int", "base"), ("int", "exponent")], math_pow),
+        ("int", "sqrt", [("int", "x")], math_sqrt),
+    ]:
+        interpreter.register_native_method(MATH_LIBRARY_DEF, *method)
@@ -1,15 +1,122 @@
+import sys
+import json
 from interpreterv3 import Interpreter
+from sink import StreamSink, FileSink
+from reader import StreamReader, FileReader
+from budget import ExecutionBudget
+from tracer import Tracer
+from brewin_coverage import CoverageData
+from recording import RunLog, RecordingReader, RecordingSink
+from batch import find_jobs, find_inputs, run_batch, run_many
+from os.path import exists
 from argparse import ArgumentParser
 
 if __name__ == "__main__":
     parser = ArgumentParser()
-    parser.add_argument("source")
+    parser.add_argument("source", help="the program to run, or with --batch, a directory or JSONL manifest of jobs")
+    parser.add_argument("--batch", action="store_true", help="run many programs, printing a JSON result per line")
+    parser.add_argument("--inputs", help="run the program once per input in this directory of .in files or JSONL file")
+    parser.add_argument("--unordered", action="store_true", help="with --inputs, print results as soon as they finish")
+    parser.add_argument("--workers", type=int, help="processes to run batch jobs or inputs in; by default one per core")
+    parser.add_argument("--timeout", type=float, help="seconds before a batch job or run of an input is cancelled")
+    parser.add_argument("--output", help="write the program's output to this file instead of stdout")
+    parser.add_argument("--input", help="read the program's input from this file instead of stdin")
+    parser.add_argument("--profile", help="write per-method timings to this file, readable with pstats")
+    parser.add_argument("--profile-collapsed", help="write per-call-stack timings to this file, for flamegraphs")
+    parser.add_argument("--sample-report", help="sample the running line and write an annotated listing to this file")
+    parser.add_argument("--sample-interval", type=float, default=5, help="milliseconds between samples")
+    parser.add_argument("--heap-report", help="write object counts and sizes per class to this file")
+    parser.add_argument("--heap-snapshot", help="write the objects reachable from main at exit to this file, as JSON")
+    parser.add_argument("--max-steps", type=int, help="abort after executing this many statements")
+    parser.add_argument("--max-calls", type=int, help="abort after making this many method calls")
+    parser.add_argument("--max-depth", type=int, help="abort if method calls nest deeper than this")
+    parser.add_argument("--max-objects", type=int, help="abort after allocating this many objects")
+    parser.add_argument("--trace", help="record method calls, statements and exceptions to this file, for tracer.py")
+    parser.add_argument("--trace-size", type=int, default=1 << 16, help="how many of the latest trace records to keep")
+    parser.add_argument("--coverage", help="merge statement and branch coverage into this file, for brewin_coverage.py")
+    parser.add_argument("--record", help="append the run's input, output and timings to this log, for recording.py")
+    parser.add_argument("--timings", action="store_true", help="print seconds spent in each phase of the run to stderr")
+    parser.add_argument("--usage", action="store_true", help="print statements, calls, depth and objects used to stderr")
 
     args = parser.parse_args()
 
+    if args.batch or args.inputs:
+        limits = {"max_steps": args.max_steps, "max_calls": args.max_calls,
+                  "max_depth": args.max_depth, "max_objects": args.max_objects}
+        if args.batch:
+            all_results = run_batch(find_jobs(args.source), args.workers, limits, args.timeout)
+        else:
+            with open(args.source, "r") as f:
+                all_results = run_many(
+                    f.readlines(), find_inputs(args.inputs), args.workers, limits, args.timeout, not args.unordered
+                )
+        results = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            for result in all_results:
+                results.write(json.dumps(result) + "\n")
+                results.flush()
+        finally:
+            if args.output:
+                results.close()
+        sys.exit(0)
+
     with open(args.source, "r") as f:
         data = f.readlines()
-    
-    inter = Interpreter()
-    inter.run(data)
 
+    # the command line has no use for the output log, so don't keep one
+    sink = FileSink(args.output) if args.output else StreamSink(sys.stdout)
+    # input from a file or a pipe is read in chunks; a terminal is read line by line
+    if args.input:
+        reader = FileReader(args.input, parse_ints=True)
+    elif not sys.stdin.isatty():
+        reader = StreamReader(sys.stdin, parse_ints=True)
+    else:
+        reader = None
+
+    inp, output_sink = reader, sink
+    if args.record:
+        inp, output_sink = RecordingReader(reader), RecordingSink(sink)
+
+    profile = bool(args.profile or args.profile_collapsed)
+    sample_interval = args.sample_interval / 1000 if args.sample_report else None
+    inter = Interpreter(
+        inp=inp, output_sink=output_sink, output_log_size=0, profile=profile, sample_interval=sample_interval,
+        trace_output=Tracer(args.trace_size) if args.trace else False,
+        track_heap=bool(args.heap_report or args.heap_snapshot), coverage=bool(args.coverage),
+        budget=ExecutionBudget(args.max_steps, args.max_calls, args.max_depth, args.max_objects)
+    )
+    if profile:
+        inter.profiler.filename = args.source
+
+    try:
+        inter.run(data)
+    finally:
+        if args.trace:
+            inter.tracer.dump(args.trace)
+        if args.coverage:
+            coverage = CoverageData.load(args.coverage) if exists(args.coverage) else CoverageData()
+            coverage.add(args.source, inter.coverage)
+            coverage.save(args.coverage)
+        if args.record:
+            RunLog(args.record).append(data, inp, output_sink, inter)
+        if args.timings:
+            print(json.dumps(inter.timings), file=sys.stderr)
+        if args.usage:
+            print(json.dumps(inter.get_usage()), file=sys.stderr)
+        if args.profile:
+            inter.profiler.dump_stats(args.profile)
+        if args.profile_collapsed:
+            inter.profiler.write_collapsed_stacks(args.profile_collapsed)
+        if args.sample_report:
+            with open(args.sample_report, "w", encoding="utf-8") as f:
+                f.write("\n".join(inter.sampler.annotate(data)) + "\n")
+        if args.heap_report:
+            with open(args.heap_report, "w", encoding="utf-8") as f:
+                f.write("\n".join(inter.heap.report(inter.main_object)) + "\n")
+        if args.heap_snapshot and inter.main_object is not None:
+            with open(args.heap_snapshot, "w", encoding="utf-8") as f:
+                json.dump(inter.heap.snapshot(inter.main_object), f, indent=4)
+        if args.output:
+            sink.close()
+        if args.input:
+            reader.close()
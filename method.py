@@ -5,11 +5,13 @@ from value import get_default_value_as_brewin_literal
 from result import Result
 
 class Method:
-    def __init__(self, method_def):
+    def __init__(self, method_def, interpreter_ref):
         # indicates whether any error has occurred in defining this method
         self.status = Result.Ok()
+        self.interpreter_ref = interpreter_ref
         self.name = method_def.name
         self.statement = method_def.statement
+        self.native = method_def.native
         self.return_type = None
         self.params_as_fields = []
 
@@ -33,7 +35,7 @@ class Method:
         if not self.status.ok:
             return
         
-        ret_type_res = str_to_type(return_type)
+        ret_type_res = str_to_type(return_type, self.interpreter_ref)
         if not ret_type_res.ok:
             self.status = ret_type_res
             self.status.line_num = return_type.line_num
@@ -50,9 +52,9 @@ class Method:
             param_as_field_def = FieldDef(
                 param_type,
                 param_name,
-                get_default_value_as_brewin_literal(param_type)
+                get_default_value_as_brewin_literal(param_type, self.interpreter_ref)
             )
-            param_as_field = Field.from_field_def(param_as_field_def)
+            param_as_field = Field.from_field_def(param_as_field_def, self.interpreter_ref)
             if not param_as_field.status.ok:
                 self.status = param_as_field.status
                 return
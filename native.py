@@ -0,0 +1,124 @@
+from intbase import InterpreterBase, ErrorType
+from btypes import str_to_type
+from classdef import ClassDef, MethodDef
+from bparser import StringWithLineNumber
+from result import Result
+
+
+class NativeClassDef(ClassDef):
+    """
+    Class definition for built-in classes whose methods are Python functions rather
+    than Brewin statements. Instances are ordinary Objects, so they work with new,
+    call, let and the type checker exactly like user classes
+    A native method is called as function(obj, line_num_of_call, *argument_values)
+    and returns a Value, or None for void methods
+    """
+    def __init__(self, name, methods, interpreter_ref, type_arguments=(), create_state=None):
+        # methods: (return type, name, ((param type, param name), ...), function)
+        # create_state: called with this class def to make the storage for each new instance
+        super().__init__([InterpreterBase.CLASS_DEF, name], interpreter_ref)
+        self.type_arguments = list(type_arguments)
+        self.__create_state = create_state
+        self.__native_method_defs = {}
+
+        for return_type, method_name, formal_params, function in methods:
+            self.__native_method_defs[method_name] = MethodDef(
+                StringWithLineNumber(return_type, None),
+                StringWithLineNumber(method_name, None),
+                [
+                    [StringWithLineNumber(param_type, None), StringWithLineNumber(param_name, None)]
+                    for param_type, param_name in formal_params
+                ],
+                None,
+                function
+            )
+
+    def get_method_defs(self):
+        return self.__native_method_defs
+
+    def create_native_state(self):
+        if self.__create_state is None:
+            return None
+        return self.__create_state(self)
+
+
+class NativeTClassDef:
+    """
+    Templated counterpart to NativeClassDef. Subclasses give the templated class's
+    name, type parameters and methods; instantiating it with type arguments,
+    e.g. array@int, substitutes them into the method signatures
+    """
+    def __init__(self, name, type_params, interpreter_ref):
+        self.name = name
+        self.type_params = type_params
+        self.interpreter_ref = interpreter_ref
+        # methods added through Interpreter.register_native_method
+        self.__registered_methods = {}
+
+    def register(self):
+        """Register this templated class as a type of its interpreter's program"""
+        res = self.interpreter_ref.tclass_registry.register(self.name, len(self.type_params))
+        if not res.ok:
+            self.interpreter_ref.error(*res[1:])
+
+    def methods(self):
+        """(return type, name, ((param type, param name), ...), function) for each method"""
+        return []
+
+    def add_method(self, return_type, method_name, formal_params, function):
+        # replaces any built-in method of the same name
+        self.__registered_methods[method_name] = (return_type, method_name, formal_params, function)
+
+    def create_native_state(self, class_def):
+        """Python-side storage for a new instance of class_def"""
+        return None
+
+    def check_type_arguments(self, type_arguments):
+        """Hook for rejecting type arguments; returns a Result"""
+        return Result.Ok()
+
+    def convert_to_class_def(self, instantiated_type):
+        _, *type_argument_strings = instantiated_type.split(InterpreterBase.TYPE_CONCAT_CHAR)
+
+        if len(type_argument_strings) != len(self.type_params):
+            self.interpreter_ref.error(
+                ErrorType.TYPE_ERROR,
+                f"Attempted to instantiate templated class {self.name} with wrong number of type arguments"
+            )
+
+        type_arguments = []
+        for type_arg_str in type_argument_strings:
+            type_arg_res = str_to_type(type_arg_str, self.interpreter_ref)
+            if not type_arg_res.ok:
+                self.interpreter_ref.error(*type_arg_res[1:])
+            type_arguments.append(type_arg_res.unwrap())
+
+        res = self.check_type_arguments(type_arguments)
+        if not res.ok:
+            self.interpreter_ref.error(*res[1:])
+
+        type_mapping = {
+            type_param: str(type_arg) for type_param, type_arg in zip(self.type_params, type_arguments)
+        }
+        concretized_methods = [
+            (
+                type_mapping.get(return_type, return_type),
+                method_name,
+                [(type_mapping.get(param_type, param_type), param_name) for param_type, param_name in formal_params],
+                function
+            )
+            for return_type, method_name, formal_params, function in self.__all_methods()
+        ]
+
+        return NativeClassDef(
+            instantiated_type,
+            concretized_methods,
+            self.interpreter_ref,
+            type_arguments,
+            self.create_native_state
+        )
+
+    def __all_methods(self):
+        methods = {method[1]: method for method in self.methods()}
+        methods.update(self.__registered_methods)
+        return methods.values()
@@ -0,0 +1,115 @@
+import marshal
+import time
+
+
+class MethodProfiler:
+    """
+    Deterministic profiler for Brewin methods, driven by Object.execute_method
+    Records the call count, total time, self time and callers of each method of
+    each class (including template instantiations like node@int), plus the self
+    time of every distinct call stack for flamegraphs
+    Stats are in the format pstats expects, so pstats.Stats(profiler) works directly
+    """
+    def __init__(self, filename="<brewin>", clock=time.perf_counter_ns):
+        self.filename = filename
+        self.clock = clock
+        # method key -> [primitive calls, calls, self ns, total ns, {caller key: [same, minus callers]}]
+        self.method_stats = {}
+        # call stack trie: node is [{method key: child node}, self ns]
+        self.call_tree = [{}, 0]
+        # frames of [method key, start ns, ns spent in callees, call tree node]
+        self.__stack = []
+        # method key -> number of calls currently on the stack, to spot recursion
+        self.__active = {}
+        self.__keys = {}
+        self.stats = {}
+
+    def enter(self, class_def, method):
+        key = self.__key(class_def, method)
+        parent_node = self.__stack[-1][3] if self.__stack else self.call_tree
+        node = parent_node[0].get(key)
+        if node is None:
+            node = parent_node[0][key] = [{}, 0]
+
+        self.__active[key] = self.__active.get(key, 0) + 1
+        self.__stack.append([key, self.clock(), 0, node])
+
+    def exit(self):
+        key, start, callee_time, node = self.__stack.pop()
+        elapsed = self.clock() - start
+        self_time = elapsed - callee_time
+        node[1] += self_time
+
+        self.__active[key] -= 1
+        # like cProfile, only the outermost call of a recursion counts towards total time
+        primitive = self.__active[key] == 0
+
+        entry = self.method_stats.get(key)
+        if entry is None:
+            entry = self.method_stats[key] = [0, 0, 0, 0, {}]
+        self.__record(entry, primitive, self_time, elapsed)
+
+        if self.__stack:
+            caller = self.__stack[-1]
+            caller[2] += elapsed
+            edge = entry[4].get(caller[0])
+            if edge is None:
+                edge = entry[4][caller[0]] = [0, 0, 0, 0]
+            self.__record(edge, primitive, self_time, elapsed)
+
+    def create_stats(self):
+        """Fill self.stats in the format used by pstats, with times in seconds"""
+        # pstats orders caller entries (calls, primitive calls, ...), unlike the method entries
+        self.stats = {
+            key: (
+                cc, nc, tt / 1e9, ct / 1e9,
+                {caller: (e_nc, e_cc, e_tt / 1e9, e_ct / 1e9) for caller, (e_cc, e_nc, e_tt, e_ct) in callers.items()}
+            )
+            for key, (cc, nc, tt, ct, callers) in self.method_stats.items()
+        }
+
+    def dump_stats(self, path):
+        """Write the stats to path in the marshal format read by pstats.Stats(path)"""
+        self.create_stats()
+        with open(path, "wb") as handle:
+            marshal.dump(self.stats, handle)
+
+    def collapsed_stacks(self):
+        """Lines of 'outer;inner;innermost self_microseconds', as read by flamegraph.pl"""
+        lines = []
+        pending = [(self.call_tree, [])]
+        while pending:
+            (children, _), path = pending.pop()
+            for key, child in children.items():
+                child_path = path + [key[2]]
+                if child[1] > 0:
+                    lines.append(f"{';'.join(child_path)} {child[1] // 1000}")
+                pending.append((child, child_path))
+
+        return lines
+
+    def write_collapsed_stacks(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            for line in self.collapsed_stacks():
+                handle.write(line + "\n")
+
+    def __key(self, class_def, method):
+        # (file, line, name) like the function keys of pstats; line numbers are 1-based
+        cache_key = (class_def.name, method.name)
+        key = self.__keys.get(cache_key)
+        if key is None:
+            line_num = getattr(method.name, "line_num", None)
+            key = self.__keys[cache_key] = (
+                self.filename,
+                line_num + 1 if line_num is not None else 0,
+                f"{class_def.name}.{method.name}"
+            )
+        return key
+
+    @staticmethod
+    def __record(entry, primitive, self_time, elapsed):
+        entry[1] += 1
+        entry[2] += self_time
+        if primitive:
+            entry[0] += 1
+            entry[3] += elapsed
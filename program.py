@@ -0,0 +1,33 @@
+class Program:
+    """
+    A Brewin# program compiled by Interpreter.compile: parsed, with its classes and
+    templated classes defined and their field and method definitions extracted
+    Running it only instantiates main and executes, so a program run against many
+    inputs is parsed and defined once
+    A Program is not independent of the Interpreter that compiled it: its class
+    definitions belong to that Interpreter, so runs happen one at a time on it, share
+    its settings (budget, profiler, output log size, ...) and leave their output and
+    error on it. Only the input, output sink and cancel token are chosen per run
+    """
+    def __init__(self, interpreter, source):
+        self.__interpreter = interpreter
+        self.__source = tuple(source)
+
+    @property
+    def interpreter(self):
+        """The Interpreter that compiled this program, holding the error and usage of the last run"""
+        return self.__interpreter
+
+    @property
+    def source(self):
+        return self.__source
+
+    def run(self, inp=None, output_sink=None, cancel_token=None):
+        """
+        Run the program with inp (a list of input lines or an InputReader), output_sink
+        and cancel_token, returning the lines it printed; any not given are the ones
+        the Interpreter was created with
+        Raises RuntimeError like Interpreter.run if the program errors out
+        """
+        self.__interpreter.run_compiled(inp, output_sink, cancel_token)
+        return self.__interpreter.get_output()
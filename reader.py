@@ -0,0 +1,134 @@
+import codecs
+import io
+
+
+class InputReader:
+    """
+    Base class for a lazily read source of input lines for inputi and inputs
+    """
+    def read_line(self):
+        """The next line without its newline, or None once the input is exhausted"""
+        return None
+
+    def ready(self):
+        """Whether the next line can be read without waiting, e.g. on another process"""
+        return True
+
+    def read_int(self):
+        """The next line as an int"""
+        line = self.read_line()
+        if line is None:
+            raise EOFError("No more input")
+        return int(line)
+
+
+class IteratorReader(InputReader):
+    """
+    Reads input lines from any iterable of strings, such as a generator
+    """
+    def __init__(self, lines):
+        self.__lines = iter(lines)
+
+    def read_line(self):
+        line = next(self.__lines, None)
+        if line is None:
+            return None
+        return line.rstrip("\n")
+
+
+class StreamReader(InputReader):
+    """
+    Reads input lines from a text stream, such as an open file or a pipe, in chunks
+    of up to chunk_size characters, so only one chunk is held in memory at a time
+    A chunk is whatever has arrived so far, rather than a full chunk_size, so a program
+    talking to another process over a pipe is not stalled waiting for more input
+    With parse_ints, each chunk is converted to ints in bulk up front, which makes
+    read_int cheaper for inputs that are mostly numbers
+    """
+    def __init__(self, stream, chunk_size=1 << 16, parse_ints=False):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.parse_ints = parse_ints
+        self.__lines = []
+        self.__ints = None
+        self.__cursor = 0
+        # the unfinished last line of the most recent chunk
+        self.__partial = ""
+        self.__eof = False
+        # streams over a binary buffer are read through it, which returns what is
+        # available rather than waiting for a whole chunk
+        self.__decoder = None
+        if hasattr(getattr(stream, "buffer", None), "read1"):
+            decoder = codecs.getincrementaldecoder(getattr(stream, "encoding", None) or "utf-8")()
+            # translates \r\n to \n as text streams do, even when split across chunks
+            self.__decoder = io.IncrementalNewlineDecoder(decoder, translate=True)
+
+    def read_line(self):
+        if not self.__fill():
+            return None
+        line = self.__lines[self.__cursor]
+        self.__cursor += 1
+        return line
+
+    def ready(self):
+        return self.__eof or self.__cursor < len(self.__lines)
+
+    def read_int(self):
+        if not self.__fill():
+            raise EOFError("No more input")
+        if self.__ints is None:
+            return int(self.read_line())
+        value = self.__ints[self.__cursor]
+        self.__cursor += 1
+        return value
+
+    def __fill(self):
+        # makes sure there is an unread line, returning False if the input is exhausted
+        while self.__cursor >= len(self.__lines):
+            if self.__eof:
+                return False
+
+            chunk = self.__read_chunk()
+            if chunk:
+                lines = (self.__partial + chunk).split("\n")
+                self.__partial = lines.pop()
+            else:
+                self.__eof = True
+                lines = [self.__partial] if self.__partial else []
+                self.__partial = ""
+
+            self.__lines = lines
+            self.__cursor = 0
+            self.__ints = self.__parse_ints(lines) if self.parse_ints else None
+
+        return True
+
+    def __read_chunk(self):
+        if self.__decoder is None:
+            return self.stream.read(self.chunk_size)
+
+        while True:
+            data = self.stream.buffer.read1(self.chunk_size)
+            chunk = self.__decoder.decode(data, final=not data)
+            # data ending part way through a character decodes to nothing, so read on
+            if chunk or not data:
+                return chunk
+
+    @staticmethod
+    def __parse_ints(lines):
+        try:
+            return list(map(int, lines))
+        except ValueError:
+            # the chunk has non-numeric lines, so fall back to converting line by line
+            return None
+
+
+class FileReader(StreamReader):
+    """
+    StreamReader over the file at path
+    """
+    def __init__(self, path, chunk_size=1 << 16, parse_ints=False):
+        super().__init__(open(path, encoding="utf-8"), chunk_size, parse_ints)
+
+    def close(self):
+        self.stream.close()
@@ -0,0 +1,179 @@
+"""
+Records runs of Brewin# programs to a log, and replays them to check their output
+and compare their speed:
+    python3 recording.py path/to/log [--repeat N] [--json]
+"""
+
+import hashlib
+import json
+import sys
+from argparse import ArgumentParser
+from os.path import exists
+from reader import InputReader, IteratorReader, StreamReader
+from sink import OutputSink
+
+
+class RecordingReader(InputReader):
+    """
+    Reads input from source, a list of lines, an InputReader, or stdin if None, and
+    keeps every line read
+    """
+    def __init__(self, source=None):
+        if source is None:
+            # a StreamReader knows when it would wait on stdin, so output is flushed first
+            source = StreamReader(sys.stdin)
+        self.source = source if isinstance(source, InputReader) else IteratorReader(source)
+        self.lines = []
+
+    def ready(self):
+        return self.source.ready()
+
+    def read_line(self):
+        line = self.source.read_line()
+        if line is not None:
+            self.lines.append(line)
+        return line
+
+    def read_int(self):
+        value = self.source.read_int()
+        self.lines.append(str(value))
+        return value
+
+
+class RecordingSink(OutputSink):
+    """
+    Passes printed lines on to sink, if given, and keeps them
+    """
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.lines = []
+
+    def write(self, line):
+        self.lines.append(line)
+        if self.sink is not None:
+            self.sink.write(line)
+
+    def flush(self):
+        if self.sink is not None:
+            self.sink.flush()
+
+
+class RunLog:
+    """
+    Append-only log of runs, one compact JSON record per line
+    Each program is stored once, in a program record with its hash and source; each
+    run is a run record with the hash of its program, the lines it read and printed,
+    the error it ended with, if any, and its phase timings
+    """
+    def __init__(self, path):
+        self.path = path
+        self.__logged_programs = set()
+        if exists(path):
+            for record in read_log(path):
+                if record["type"] == "program":
+                    self.__logged_programs.add(record["hash"])
+
+    def append(self, program, reader, sink, interpreter):
+        """
+        Log a run of program (its lines of source), given the RecordingReader and
+        RecordingSink it ran with, once the interpreter is done with it
+        """
+        program_hash = hash_program(program)
+        records = []
+        if program_hash not in self.__logged_programs:
+            self.__logged_programs.add(program_hash)
+            records.append({"type": "program", "hash": program_hash, "source": program})
+
+        error_type, error_line = interpreter.get_error_type_and_line()
+        records.append({
+            "type": "run",
+            "program": program_hash,
+            "input": reader.lines,
+            "output": sink.lines,
+            "error": [str(error_type), error_line] if error_type is not None else None,
+            "timings": interpreter.timings,
+        })
+
+        with open(self.path, "a", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def hash_program(program):
+    return hashlib.sha256("".join(program).encode("utf-8")).hexdigest()
+
+
+def read_log(path):
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def replay(path, repeat=1):
+    """
+    Re-run every run in the log at path, repeat times each, and return for each run
+    whether its output and error matched the recording, and its recorded and best
+    replayed total time in seconds
+    """
+    from interpreterv3 import Interpreter
+
+    programs = {}
+    results = []
+    for record in read_log(path):
+        if record["type"] == "program":
+            programs[record["hash"]] = record["source"]
+            continue
+
+        program = programs[record["program"]]
+        best = None
+        for _ in range(repeat):
+            interpreter = Interpreter(False, IteratorReader(record["input"]))
+            try:
+                interpreter.run(program)
+            except RuntimeError:
+                pass
+            if best is None or interpreter.timings["total"] < best:
+                best = interpreter.timings["total"]
+
+        error_type, error_line = interpreter.get_error_type_and_line()
+        error = [str(error_type), error_line] if error_type is not None else None
+        results.append({
+            "program": record["program"],
+            "matched": interpreter.get_output() == record["output"] and error == record["error"],
+            "recorded": record["timings"].get("total"),
+            "replayed": best,
+        })
+
+    return results
+
+
+def format_replay(results):
+    """Lines of a table of replay results, with the change in time of each run"""
+    lines = [f"{'run':>5} {'program':<14} {'output':<9} {'recorded ms':>12} {'replayed ms':>12} {'delta':>8}"]
+    for index, result in enumerate(results):
+        recorded, replayed = result["recorded"], result["replayed"]
+        delta = f"{100 * (replayed - recorded) / recorded:+7.1f}%" if recorded else f"{'-':>8}"
+        lines.append(
+            f"{index:>5} {result['program'][:12]:<14} {'ok' if result['matched'] else 'MISMATCH':<9} "
+            f"{(recorded or 0) * 1000:>12.3f} {replayed * 1000:>12.3f} {delta}"
+        )
+
+    mismatches = sum(1 for result in results if not result["matched"])
+    lines.append(f"{len(results) - mismatches}/{len(results)} runs matched")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Replay the runs in a log written by main.py --record")
+    parser.add_argument("log")
+    parser.add_argument("--repeat", type=int, default=1, help="run each recording this many times, keeping the fastest")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    replay_results = replay(args.log, args.repeat)
+    if args.json:
+        json.dump(replay_results, sys.stdout, indent=4)
+        sys.stdout.write("\n")
+    else:
+        sys.stdout.write("".join(line + "\n" for line in format_replay(replay_results)))
+
+    sys.exit(0 if all(result["matched"] for result in replay_results) else 1)
@@ -0,0 +1,64 @@
+class Rope:
+    """
+    Lazily joined Brewin string. Concatenating onto a Rope is O(1): the pieces are
+    only joined into a Python str when the rope is flattened, which happens when it
+    is compared, printed or otherwise needs its actual contents
+    """
+    # concatenations shorter than this are joined eagerly, since a Rope node
+    # costs more than copying a handful of characters
+    EAGER_JOIN_LENGTH = 64
+
+    __slots__ = ("left", "right", "length", "flat")
+
+    def __init__(self, left, right):
+        # left and right are each either a str or a Rope
+        self.left = left
+        self.right = right
+        self.length = len(left) + len(right)
+        self.flat = None
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        if self.flat is None:
+            self.flat = self.__join()
+            # drop the pieces so they can be garbage collected
+            self.left = None
+            self.right = None
+
+        return self.flat
+
+    def __repr__(self):
+        return str(self)
+
+    def __join(self):
+        # iterative in-order walk; ropes built in a loop are as deep as the loop is long
+        pieces = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                pieces.append(node)
+            elif node.flat is not None:
+                pieces.append(node.flat)
+            else:
+                stack.append(node.right)
+                stack.append(node.left)
+
+        return "".join(pieces)
+
+
+def concat(left, right):
+    """
+    Concatenate two Brewin strings, each of which is a str or a Rope
+    """
+    if not left:
+        return right
+    if not right:
+        return left
+
+    if len(left) + len(right) < Rope.EAGER_JOIN_LENGTH:
+        return str(left) + str(right)
+
+    return Rope(left, right)
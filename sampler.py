@@ -0,0 +1,107 @@
+import sys
+import threading
+from collections import Counter
+from intbase import InterpreterBase
+from brewin_object import Object
+
+# the frames executing Brewin statements; each has the statement being run as a local
+STATEMENT_CODE = Object._Object__execute_statement.__code__
+
+
+class LineSampler:
+    """
+    Sampling profiler attributing time to lines of a Brewin program
+    A background thread wakes up every interval seconds and reads the statements
+    being executed off the interpreter thread's stack, so the interpreter does no
+    extra work per statement. Each sample counts towards the innermost statement's
+    line (self samples), every line on the stack (total samples), and every while
+    loop on the stack (loop samples)
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.num_samples = 0
+        self.self_samples = Counter()
+        self.total_samples = Counter()
+        self.loop_samples = Counter()
+        self.__thread = None
+        self.__stopped = threading.Event()
+
+    def start(self, thread_id=None):
+        """Start sampling the thread with thread_id, by default the calling thread"""
+        target = thread_id if thread_id is not None else threading.get_ident()
+        self.__stopped.clear()
+        self.__thread = threading.Thread(target=self.__run, args=(target,), daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def hot_lines(self, limit=10):
+        """(line, self samples, total samples) for the lines with the most self samples"""
+        return [(line, count, self.total_samples[line]) for line, count in self.self_samples.most_common(limit)]
+
+    def hot_loops(self, limit=10):
+        """(line of the while, samples) for the loops with the most samples"""
+        return self.loop_samples.most_common(limit)
+
+    def annotate(self, program):
+        """
+        Lines of a report on program (its lines of source): the hottest lines and loops,
+        then the source with the percentage of self and total samples for each line
+        Line numbers are 1-based, as in an editor
+        """
+        num_samples = max(self.num_samples, 1)
+
+        def percent(count):
+            return f"{100 * count / num_samples:5.1f}%" if count else " " * 6
+
+        report = [f"{self.num_samples} samples, one every {self.interval * 1000:g} ms", "", "Hot lines (self, total):"]
+        for line, self_count, total_count in self.hot_lines():
+            report.append(f"  {line + 1:>5} {percent(self_count)} {percent(total_count)}  {program[line].strip()}")
+
+        report += ["", "Hot loops:"]
+        for line, count in self.hot_loops():
+            report.append(f"  {line + 1:>5} {percent(count)}  {program[line].strip()}")
+
+        report += ["", "  line   self  total"]
+        for line, source in enumerate(program):
+            report.append(
+                f"{line + 1:>6} {percent(self.self_samples[line])} {percent(self.total_samples[line])}  {source.rstrip()}"
+            )
+
+        return report
+
+    def __run(self, thread_id):
+        while not self.__stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                return
+            self.__sample(frame)
+
+    def __sample(self, frame):
+        statements = []
+        while frame is not None:
+            if frame.f_code is STATEMENT_CODE:
+                statements.append(frame.f_locals["statement"])
+            frame = frame.f_back
+
+        # not running Brewin code yet, e.g. still parsing
+        if not statements:
+            return
+
+        self.num_samples += 1
+        self.self_samples[statements[0][0].line_num] += 1
+
+        # recursion puts the same line on the stack many times, but it only counts once per sample
+        lines = set()
+        loops = set()
+        for statement in statements:
+            lines.add(statement[0].line_num)
+            if statement[0] == InterpreterBase.WHILE_DEF:
+                loops.add(statement[0].line_num)
+
+        self.total_samples.update(lines)
+        self.loop_samples.update(loops)
@@ -0,0 +1,61 @@
+import sys
+
+
+class OutputSink:
+    """
+    Base class for where an Interpreter sends the lines a Brewin program prints
+    """
+    def write(self, line):
+        pass
+
+    def flush(self):
+        pass
+
+
+class StreamSink(OutputSink):
+    """
+    Block-buffered sink for a text stream such as sys.stdout or an open file
+    Lines are collected and written in one go once buffer_size characters have built up
+    """
+    def __init__(self, stream=None, buffer_size=1 << 16):
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self.__lines = []
+        self.__buffered = 0
+
+    def write(self, line):
+        self.__lines.append(line)
+        self.__buffered += len(line) + 1
+        if self.__buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.__lines:
+            self.__lines.append("")
+            self.stream.write("\n".join(self.__lines))
+            self.__lines = []
+            self.__buffered = 0
+        self.stream.flush()
+
+
+class FileSink(StreamSink):
+    """
+    Block-buffered sink writing to the file at path
+    """
+    def __init__(self, path, buffer_size=1 << 16):
+        super().__init__(open(path, "w", encoding="utf-8"), buffer_size)
+
+    def close(self):
+        self.flush()
+        self.stream.close()
+
+
+class CallbackSink(OutputSink):
+    """
+    Sink calling callback with each line as it is printed
+    """
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, line):
+        self.callback(line)
@@ -1,5 +1,5 @@
 from intbase import InterpreterBase, ErrorType
-from btypes import str_to_type, TClassRegistry
+from btypes import str_to_type
 from classdef import ClassDef
 from bparser import StringWithLineNumber
 
@@ -24,7 +24,7 @@ class TClassDef:
             )
         
         # register this templated class
-        res = TClassRegistry.register(self.name, len(self.type_params))
+        res = self.interpreter_ref.tclass_registry.register(self.name, len(self.type_params))
         if not res.ok:
             res.line_num = tclass_def[0].line_num
             self.interpreter_ref.error(*res[1:])
@@ -40,7 +40,7 @@ class TClassDef:
         
         type_mapping = {}
         for type_param, type_arg_str in zip(self.type_params, type_arguments):
-            type_arg_res = str_to_type(type_arg_str)
+            type_arg_res = str_to_type(type_arg_str, self.interpreter_ref)
             if not type_arg_res.ok:
                 self.interpreter_ref.error(
                     *type_arg_res[1:]
@@ -77,7 +77,7 @@ class TClassDef:
 
         # using str_to_type to check validity of the type
         # rather than actually convert to the corresponding Type
-        type_res = str_to_type(concretized_type_string)
+        type_res = str_to_type(concretized_type_string, self.interpreter_ref)
         
         if not type_res.ok:
             type_res.line_num = line_num
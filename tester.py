@@ -4,14 +4,19 @@ Implements all CS 131-related test logic; is entry-point for testing framework.
 
 import asyncio
 import importlib
+from glob import glob
 from os import environ, listdir
 import sys
 import traceback
 from operator import itemgetter
 
+from reader import FileReader
 from harness import (
     AbstractTestScaffold,
+    ResultCache,
+    hash_file,
     run_all_tests,
+    run_all_tests_parallel,
     get_score,
     write_gradescope_output,
 )
@@ -20,8 +25,10 @@ from harness import (
 class TestScaffold(AbstractTestScaffold):
     """Implement scaffold for Brewin' interpreter; load file, validate syntax, run testcase."""
 
-    def __init__(self, interpreter_lib):
+    def __init__(self, interpreter_lib, streaming_input=False):
         self.interpreter_lib = interpreter_lib
+        # read .in files lazily with a FileReader instead of loading them up front
+        self.streaming_input = streaming_input
 
     def setup(self, test_case):
         inputfile, expfile, srcfile = itemgetter("inputfile", "expfile", "srcfile")(
@@ -32,8 +39,11 @@ class TestScaffold(AbstractTestScaffold):
             expected = list(map(lambda x: x.rstrip("\n"), handle.readlines()))
 
         try:
-            with open(inputfile, encoding="utf-8") as handle:
-                stdin = list(map(lambda x: x.rstrip("\n"), handle.readlines()))
+            if self.streaming_input:
+                stdin = FileReader(inputfile)
+            else:
+                with open(inputfile, encoding="utf-8") as handle:
+                    stdin = list(map(lambda x: x.rstrip("\n"), handle.readlines()))
         except FileNotFoundError:
             stdin = None
 
@@ -47,15 +57,26 @@ class TestScaffold(AbstractTestScaffold):
         }
 
     def run_test_case(self, test_case, environment):
+        try:
+            return self.__run_test_case(test_case, environment)
+        finally:
+            if isinstance(environment["stdin"], FileReader):
+                environment["stdin"].close()
+
+    def __run_test_case(self, test_case, environment):
         expect_failure = itemgetter("expect_failure")(test_case)
         stdin, expected, program = itemgetter("stdin", "expected", "program")(
             environment
         )
-        interpreter = self.interpreter_lib.Interpreter(False, stdin, False)
+        interpreter = self.interpreter_lib.Interpreter(
+            False, stdin, False, cancel_token=environment.get("cancel_token")
+        )
         try:
-            interpreter.validate_program(program)
             interpreter.run(program)
         except Exception as exception:  # pylint: disable=broad-except
+            if interpreter.cancel_token.cancelled:
+                # timed out; the harness reports it
+                return 0
             if expect_failure:
                 error_type, _ = interpreter.get_error_type_and_line()
                 received = [f"{error_type}"]
@@ -233,11 +254,25 @@ def generate_test_suite_v3():
 
     return __generate_test_suite(3, all_tests, all_fails)
 
+CACHE_PATH = ".tester_cache.json"
+
+
+def hash_sources():
+    """Combined hash of the Python sources next to this file, i.e. the interpreter and harness"""
+    return ",".join(hash_file(path) for path in sorted(glob("*.py")))
+
+
 async def main():
     """main entrypoint: argparses, delegates to test scaffold, suite generator, gradescope output"""
     if not sys.argv:
         raise ValueError("Error: Missing version number argument")
     version = sys.argv[1]
+    # --workers N runs tests in N processes at once; 0 means one per core
+    workers = 1
+    if "--workers" in sys.argv[2:]:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+    # --force reruns tests whose results are cached
+    force = "--force" in sys.argv[2:]
 
     match version:
         case "1":
@@ -252,9 +287,19 @@ async def main():
     module_name = f"interpreterv{version}"
     interpreter = importlib.import_module(module_name)
 
-    scaffold = TestScaffold(interpreter)
+    scaffold = TestScaffold(interpreter, streaming_input=version == "3")
+
+    # cached results are reused until the test's files or any source file changes
+    cache = ResultCache(CACHE_PATH, salt=f"v{version}:{hash_sources()}")
+    if force:
+        for test in tests:
+            cache.forget(test)
 
-    results = await run_all_tests(scaffold, tests)
+    if workers == 1:
+        results = await run_all_tests(scaffold, tests, cache=cache)
+    else:
+        results = run_all_tests_parallel(scaffold, tests, workers=workers or None, cache=cache)
+    cache.save()
     total_score = get_score(results) / len(results) * 100.0
     print(f"Total Score: {total_score:9.2f}%")
 
@@ -0,0 +1,51 @@
+import time
+
+
+class PhaseTimer:
+    """
+    Splits the time of a run into named phases
+    Time is charged to the innermost phase entered, so a phase entered part way through
+    another (like concretizing a template during execution) is not counted twice
+    """
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        # phase -> ns, in the order the phases were first entered
+        self.elapsed = {}
+        self.__stack = []
+        self.__mark = clock()
+
+    def switch(self, phase):
+        """End the current phase and start the next one"""
+        self.__charge()
+        if self.__stack:
+            self.__stack[-1] = phase
+        else:
+            self.__stack.append(phase)
+        self.elapsed.setdefault(phase, 0)
+
+    def enter(self, phase):
+        """Start a phase nested in the current one"""
+        self.__charge()
+        self.__stack.append(phase)
+        self.elapsed.setdefault(phase, 0)
+
+    def exit(self):
+        """End a nested phase, returning to the phase it was entered from"""
+        self.__charge()
+        self.__stack.pop()
+
+    def stop(self):
+        self.__charge()
+        self.__stack.clear()
+
+    def seconds(self):
+        """Seconds spent in each phase, plus the total"""
+        timings = {phase: ns / 1e9 for phase, ns in self.elapsed.items()}
+        timings["total"] = sum(self.elapsed.values()) / 1e9
+        return timings
+
+    def __charge(self):
+        now = self.clock()
+        if self.__stack:
+            self.elapsed[self.__stack[-1]] += now - self.__mark
+        self.__mark = now
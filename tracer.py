@@ -0,0 +1,190 @@
+"""
+Execution tracer for Brewin# programs, and a decoder for the traces it writes:
+    python3 tracer.py path/to/trace [--json] [--last N]
+"""
+
+import json
+import struct
+import sys
+import time
+from argparse import ArgumentParser
+from intbase import InterpreterBase
+
+# timestamp (ns since the tracer was created), event, statement kind, line (-1 if unknown), name
+RECORD = struct.Struct("<QBBxxiI")
+# magic, format version, capacity in records, records written, length of the names table
+HEADER = struct.Struct("<4sHIQI")
+MAGIC = b"BRTR"
+VERSION = 1
+
+METHOD_ENTER = 1
+METHOD_EXIT = 2
+STATEMENT = 3
+THROW = 4
+CATCH = 5
+ERROR = 6
+EVENT_NAMES = {
+    METHOD_ENTER: "enter",
+    METHOD_EXIT: "exit",
+    STATEMENT: "statement",
+    THROW: "throw",
+    CATCH: "catch",
+    ERROR: "error",
+}
+
+STATEMENT_KINDS = (
+    None,
+    InterpreterBase.BEGIN_DEF,
+    InterpreterBase.SET_DEF,
+    InterpreterBase.IF_DEF,
+    InterpreterBase.WHILE_DEF,
+    InterpreterBase.CALL_DEF,
+    InterpreterBase.RETURN_DEF,
+    InterpreterBase.INPUT_INT_DEF,
+    InterpreterBase.INPUT_STRING_DEF,
+    InterpreterBase.PRINT_DEF,
+    InterpreterBase.LET_DEF,
+    InterpreterBase.THROW_DEF,
+    InterpreterBase.TRY_DEF,
+)
+STATEMENT_CODES = {kind: code for code, kind in enumerate(STATEMENT_KINDS) if kind is not None}
+
+# names (methods, exception messages, error types) are stored once and referred to by index
+NO_NAME = 0
+MAX_NAMES = 1 << 16
+# exception messages are cut to this length
+MAX_NAME_LENGTH = 80
+
+
+class Tracer:
+    """
+    Records method enters and exits, statements, and thrown and caught exceptions of a
+    run, driven by Object, into a preallocated ring buffer of fixed-size binary records
+    Once the buffer is full, the oldest records are overwritten, so a long-running
+    program keeps the most recent capacity records. dump writes the buffer to a file
+    that read_trace decodes
+    """
+    def __init__(self, capacity=1 << 16, clock=time.perf_counter_ns):
+        self.capacity = capacity
+        self.clock = clock
+        self.buffer = bytearray(capacity * RECORD.size)
+        # records written so far, including overwritten ones
+        self.count = 0
+        self.names = [""]
+        self.__name_indices = {}
+        self.__start = clock()
+
+    def method_enter(self, class_def, method, line_num):
+        self.__record(METHOD_ENTER, 0, line_num, self.__method_name(class_def, method))
+
+    def method_exit(self, class_def, method, line_num):
+        self.__record(METHOD_EXIT, 0, line_num, self.__method_name(class_def, method))
+
+    def statement(self, name):
+        self.__record(STATEMENT, STATEMENT_CODES.get(name, 0), name.line_num, NO_NAME)
+
+    def throw(self, line_num, message):
+        self.__record(THROW, 0, line_num, self.__name(str(message)[:MAX_NAME_LENGTH]))
+
+    def catch(self, line_num, message):
+        self.__record(CATCH, 0, line_num, self.__name(str(message)[:MAX_NAME_LENGTH]))
+
+    def error(self, error_type, line_num):
+        self.__record(ERROR, 0, line_num, self.__name(str(error_type)))
+
+    def dump(self, path):
+        """Write the recorded trace to path, oldest record first"""
+        names = json.dumps(self.names).encode("utf-8")
+        num_records = min(self.count, self.capacity)
+        start = (self.count - num_records) % self.capacity * RECORD.size
+
+        with open(path, "wb") as handle:
+            handle.write(HEADER.pack(MAGIC, VERSION, num_records, self.count, len(names)))
+            handle.write(names)
+            # unroll the ring so the file is in order
+            handle.write(self.buffer[start:num_records * RECORD.size])
+            handle.write(self.buffer[:start])
+
+    def __record(self, event, kind, line_num, name):
+        offset = self.count % self.capacity * RECORD.size
+        RECORD.pack_into(
+            self.buffer, offset, self.clock() - self.__start, event, kind, -1 if line_num is None else line_num, name
+        )
+        self.count += 1
+
+    def __method_name(self, class_def, method):
+        key = (class_def.name, method.name)
+        index = self.__name_indices.get(key)
+        if index is None:
+            index = self.__name_indices[key] = self.__name(f"{class_def.name}.{method.name}")
+        return index
+
+    def __name(self, name):
+        index = self.__name_indices.get(name)
+        if index is None:
+            if len(self.names) >= MAX_NAMES:
+                return NO_NAME
+            index = self.__name_indices[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+
+def read_trace(path):
+    """
+    The records of the trace file at path, oldest first, as dicts of time (ns), event,
+    line (1-based, or None), and statement kind or name where they apply
+    """
+    with open(path, "rb") as handle:
+        magic, version, num_records, count, names_length = HEADER.unpack(handle.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} trace")
+        names = json.loads(handle.read(names_length).decode("utf-8"))
+        data = handle.read(num_records * RECORD.size)
+
+    records = []
+    for timestamp, event, kind, line_num, name in RECORD.iter_unpack(data):
+        record = {"time": timestamp, "event": EVENT_NAMES[event], "line": line_num + 1 if line_num >= 0 else None}
+        if event == STATEMENT:
+            record["kind"] = STATEMENT_KINDS[kind]
+        elif name != NO_NAME:
+            record["name"] = names[name]
+        records.append(record)
+
+    return records
+
+
+def format_trace(records):
+    """Lines of a readable trace, indented by method call depth"""
+    lines = []
+    depth = 0
+    for record in records:
+        if record["event"] == "exit":
+            # a ring buffer may start part way into a call
+            depth = max(depth - 1, 0)
+
+        line = f"line {record['line']}" if record["line"] is not None else ""
+        detail = record.get("kind") or record.get("name", "")
+        lines.append(f"{record['time'] / 1000:>12.1f} us  {line:<10} {'  ' * depth}{record['event']} {detail}")
+
+        if record["event"] == "enter":
+            depth += 1
+
+    return lines
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Decode a trace written by Tracer.dump")
+    parser.add_argument("trace")
+    parser.add_argument("--json", action="store_true", help="print one JSON record per line")
+    parser.add_argument("--last", type=int, help="only print the last N records")
+    args = parser.parse_args()
+
+    trace = read_trace(args.trace)
+    if args.last is not None:
+        trace = trace[-args.last:]
+
+    if args.json:
+        for entry in trace:
+            sys.stdout.write(json.dumps(entry) + "\n")
+    else:
+        sys.stdout.write("".join(line + "\n" for line in format_trace(trace)))
@@ -1,6 +1,6 @@
 from intbase import InterpreterBase, ErrorType
 from result import Result
-from btypes import Type, TypeRegistry, TClassRegistry, str_to_type
+from btypes import Type, str_to_type
 
 
 class Value:
@@ -53,7 +53,7 @@ def create_value(val):
     return Result.Ok(out)
 
 
-def get_default_value(typ):
+def get_default_value(typ, interpreter_ref):
     match typ:
         case Type.INT:
             return Value(Type.INT, 0)
@@ -65,23 +65,23 @@ def get_default_value(typ):
             return Value(Type.NULL, None)
         case Type.NOTHING:
             return Value(Type.NOTHING, None)
-        case typ if TypeRegistry.defines(typ):
+        case typ if interpreter_ref.type_registry.defines(typ):
             return Value(Type.NULL, None) # null by default for Type.CLASS and all classes
-        case string if TClassRegistry.defines(string.split(InterpreterBase.TYPE_CONCAT_CHAR)[0]):
-            res = str_to_type(string)
+        case string if interpreter_ref.tclass_registry.defines(string.split(InterpreterBase.TYPE_CONCAT_CHAR)[0]):
+            res = str_to_type(string, interpreter_ref)
             if not res.ok:
                 return f"get_default_value({typ})"
 
             # by this point it must be a valid type
             return Value(Type.CLASS, None)
         case _:
-            res = str_to_type(typ)
+            res = str_to_type(typ, interpreter_ref)
             if not res.ok:
                 return f"get_default_value({typ})"
-            return get_default_value(res.unwrap())
+            return get_default_value(res.unwrap(), interpreter_ref)
 
 
-def get_default_value_as_brewin_literal(typ):
+def get_default_value_as_brewin_literal(typ, interpreter_ref):
     match typ:
         case Type.INT:
             return "0"
@@ -93,19 +93,19 @@ def get_default_value_as_brewin_literal(typ):
             return InterpreterBase.NULL_DEF
         case Type.NOTHING:
             return InterpreterBase.NOTHING_DEF
-        case typ if TypeRegistry.defines(typ):
+        case typ if interpreter_ref.type_registry.defines(typ):
             return InterpreterBase.NULL_DEF
-        case string if TClassRegistry.defines(string.split(InterpreterBase.TYPE_CONCAT_CHAR)[0]):
-            res = str_to_type(string)
+        case string if interpreter_ref.tclass_registry.defines(string.split(InterpreterBase.TYPE_CONCAT_CHAR)[0]):
+            res = str_to_type(string, interpreter_ref)
             if not res.ok:
                 return f"get_default_value({typ})"
 
             # by this point it must be a valid type
             return InterpreterBase.NULL_DEF
         case _:
-            res = str_to_type(typ)
+            res = str_to_type(typ, interpreter_ref)
             if not res.ok:
                 return f"get_default_value({typ})"
-            return get_default_value_as_brewin_literal(res.unwrap())
+            return get_default_value_as_brewin_literal(res.unwrap(), interpreter_ref)
     
 